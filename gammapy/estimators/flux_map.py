@@ -1,10 +1,12 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
+import contextlib
 import logging
+from multiprocessing import Pool
 import numpy as np
 from astropy import units as u
 from astropy.io import fits
 from astropy.table import Table
-from astropy.utils import classproperty
+from astropy.utils import classproperty, lazyproperty
 from gammapy.data import GTI
 from gammapy.maps import Map, Maps
 from gammapy.modeling.models import Models, SkyModel, PowerLawSpectralModel, SpectralModel
@@ -40,9 +42,22 @@ REQUIRED_COLUMNS = {
     "likelihood": ["e_min", "e_max", "e_ref", "ref_dnde", "ref_flux", "ref_eflux", "norm"],
 }
 
+_REQUIRED_COLUMNS_SETS = {
+    sed_type: frozenset(columns) for sed_type, columns in REQUIRED_COLUMNS.items()
+}
+
 
 REQUIRED_QUANTITIES_SCAN = ["stat_scan", "stat"]
 
+_REQUIRED_SETS = {
+    sed_type: frozenset(names) for sed_type, names in REQUIRED_MAPS.items()
+}
+
+_REQUIRED_SETS_SCAN = {
+    sed_type: required | frozenset(REQUIRED_QUANTITIES_SCAN)
+    for sed_type, required in _REQUIRED_SETS.items()
+}
+
 OPTIONAL_QUANTITIES = {
     "dnde": ["dnde_err", "dnde_errp", "dnde_errn", "dnde_ul"],
     "e2dnde": ["e2dnde_err", "e2dnde_errp", "e2dnde_errn", "e2dnde_ul"],
@@ -51,6 +66,15 @@ OPTIONAL_QUANTITIES = {
     "likelihood": ["norm_err", "norm_errn", "norm_errp", "norm_ul"],
 }
 
+_NORM_KEY_MAP = {
+    sed_type: {key: key.replace(sed_type, "norm") for key in keys}
+    for sed_type, keys in OPTIONAL_QUANTITIES.items()
+}
+
+_SOURCE_KEY_MAP = {
+    sed_type: {sed_type: "norm", **keys} for sed_type, keys in _NORM_KEY_MAP.items()
+}
+
 VALID_QUANTITIES = [
     "norm",
     "norm_err",
@@ -84,6 +108,31 @@ OPTIONAL_QUANTITIES_COMMON = [
     "counts"
 ]
 
+_ALL_QUANTITIES = {
+    sed_type: tuple(
+        REQUIRED_MAPS[sed_type]
+        + OPTIONAL_QUANTITIES[sed_type]
+        + OPTIONAL_QUANTITIES_COMMON
+        + (REQUIRED_QUANTITIES_SCAN if sed_type == "likelihood" else [])
+    )
+    for sed_type in REQUIRED_MAPS
+}
+
+
+# flux maps of a worker process in `FluxMaps.get_flux_points_batch`
+_WORKER_FLUX_MAPS = None
+
+
+def _init_flux_points_worker(flux_maps):
+    """Helper function to send the flux maps once to each worker process"""
+    global _WORKER_FLUX_MAPS
+    _WORKER_FLUX_MAPS = flux_maps
+
+
+def _get_flux_points(position):
+    """Helper function for multiprocessing in `FluxMaps.get_flux_points_batch`"""
+    return _WORKER_FLUX_MAPS.get_flux_points(position=position)
+
 
 class FluxMaps:
     """A flux map / points container.
@@ -146,37 +195,44 @@ class FluxMaps:
     @staticmethod
     def all_quantities(sed_type):
         """All quantities quantities"""
-        quantities = []
-        quantities += REQUIRED_MAPS[sed_type]
-        quantities += OPTIONAL_QUANTITIES[sed_type]
-        quantities += OPTIONAL_QUANTITIES_COMMON
+        return _ALL_QUANTITIES[sed_type]
 
-        if sed_type == "likelihood":
-            quantities += REQUIRED_QUANTITIES_SCAN
+    def _available_all_quantities(self, sed_type):
+        """Quantities for a given SED type that can be derived from the data"""
+        available = set(self._data)
 
-        return quantities
+        if "ts" in available:
+            available.add("sqrt_ts")
+
+        if "npred" in available and "npred_null" in available:
+            available.add("npred_excess")
+
+        source_keys = _SOURCE_KEY_MAP.get(sed_type, {})
+        return [
+            quantity for quantity in self.all_quantities(sed_type=sed_type)
+            if source_keys.get(quantity, quantity) in available
+        ]
 
     @staticmethod
     def _validate_data(data, sed_type, check_scan=False):
         """Check that map input is valid and correspond to one of the SED type."""
+        required_sets = _REQUIRED_SETS_SCAN if check_scan else _REQUIRED_SETS
+
         try:
             keys = data.keys()
-            required = set(REQUIRED_MAPS[sed_type])
+            required = required_sets[sed_type]
         except KeyError:
             raise ValueError(f"Unknown SED type: '{sed_type}'")
 
-        if check_scan:
-            required = required.union(REQUIRED_QUANTITIES_SCAN)
-
         if not required.issubset(keys):
-            missing = required.difference(keys)
+            missing = set(required.difference(keys))
             raise ValueError(
                 "Missing data / column for sed type '{}':" " {}".format(sed_type, missing)
             )
 
     # TODO: add support for scan
     def _check_quantity(self, quantity):
-        if quantity not in self.available_quantities:
+        if quantity not in self._data:
             raise AttributeError(
                 f"Quantity '{quantity}' is not defined on current flux estimate."
             )
@@ -184,12 +240,25 @@ class FluxMaps:
     @staticmethod
     def _guess_sed_type(quantities):
         """Guess SED type from table content."""
-        valid_sed_types = list(REQUIRED_COLUMNS.keys())
-        for sed_type in valid_sed_types:
-            required = set(REQUIRED_COLUMNS[sed_type])
-            if required.issubset(quantities):
+        quantities = set(quantities)
+        for sed_type, required in _REQUIRED_COLUMNS_SETS.items():
+            if required <= quantities:
                 return sed_type
 
+    def reset_cache(self):
+        """Reset cached energy bounds and reference quantities
+
+        Reference quantities are recomputed automatically when the reference
+        model parameter values change, so this is only needed if the reference
+        model is modified in any other way.
+        """
+        self.__dict__.pop("_reference_cache", None)
+
+        for cls in self.__class__.__mro__:
+            for name, value in cls.__dict__.items():
+                if isinstance(value, lazyproperty):
+                    self.__dict__.pop(name, None)
+
     @property
     def has_stat_profiles(self):
         """Whether the fluc estimate has stat profiles"""
@@ -232,7 +301,12 @@ class FluxMaps:
 
     @property
     def reference_model(self):
-        """Reference model (`SkyModel`)"""
+        """Reference model (`SkyModel`)
+
+        The reference fluxes follow changes of the parameter values of the
+        reference spectral model. Call `reset_cache` after modifying the
+        model in any other way.
+        """
         return self._reference_model
 
     @property
@@ -254,7 +328,7 @@ class FluxMaps:
         """
         return self.energy_axis.center
 
-    @property
+    @lazyproperty
     def energy_min(self):
         """Energy min
 
@@ -265,7 +339,7 @@ class FluxMaps:
         """
         return self.energy_axis.edges[:-1]
 
-    @property
+    @lazyproperty
     def energy_max(self):
         """Energy max
 
@@ -287,16 +361,17 @@ class FluxMaps:
     def is_ul(self):
         """Whether data is an upper limit"""
         # TODO: make this a well defined behaviour
-        is_ul = self.norm.copy()
+        norm = self.norm
+        data = np.empty(norm.data.shape, dtype=bool)
 
         if "ts" in self._data and "norm_ul" in self._data:
-            is_ul.data = self.ts.data < self.ts_threshold_ul
+            np.less(self.ts.data, self.ts_threshold_ul, out=data)
         elif "norm_ul" in self._data:
-            is_ul.data = np.isfinite(self.norm_ul)
+            np.isfinite(self.norm_ul.data, out=data)
         else:
-            is_ul.data = np.isnan(self.norm)
+            np.isnan(norm.data, out=data)
 
-        return is_ul
+        return Map.from_geom(geom=norm.geom, data=data)
 
     @property
     def counts(self):
@@ -319,9 +394,9 @@ class FluxMaps:
     @property
     def npred_excess(self):
         """Predicted excess counts"""
-        self._check_quantity("npred")
-        self._check_quantity("npred_null")
-        return self._data["npred"] - self._data["npred_null"]
+        npred, npred_null = self.npred, self.npred_null
+        data = np.subtract(npred.data, npred_null.quantity.to_value(npred.unit))
+        return Map.from_geom(geom=npred.geom, data=data, unit=npred.unit)
 
     @property
     def stat_scan(self):
@@ -356,8 +431,8 @@ class FluxMaps:
 
             \sqrt{TS} = \left \{
             \begin{array}{ll}
-              -\sqrt{TS} & : \text{if} \ norm < 0 \\
-              \sqrt{TS} & : \text{else}
+              \sqrt{TS} & : \text{if} \ norm > 0 \\
+              -\sqrt{TS} & : \text{else}
             \end{array}
             \right.
 
@@ -370,7 +445,8 @@ class FluxMaps:
             return self._data["sqrt_ts"]
         else:
             with np.errstate(invalid="ignore", divide="ignore"):
-                data = np.where(self.norm > 0, np.sqrt(self.ts), -np.sqrt(self.ts))
+                data = np.sqrt(self.ts.data)
+                np.negative(data, out=data, where=~(self.norm.data > 0))
                 return Map.from_geom(geom=self.geom, data=data)
 
     @property
@@ -402,136 +478,160 @@ class FluxMaps:
         self._check_quantity("norm_ul")
         return self._data["norm_ul"]
 
+    def _get_reference_flux(self, name, compute):
+        """Reference flux cached for the current reference model parameter values"""
+        model = self.reference_spectral_model
+        values = tuple(par.value for par in model.parameters)
+        cache = self.__dict__.setdefault("_reference_cache", {})
+
+        if name in cache:
+            cached_model, cached_values, result = cache[name]
+            if cached_model is model and cached_values == values:
+                return result
+
+        result = compute(model)[self._expand_slice]
+        cache[name] = (model, values, result)
+        return result
+
     @property
     def dnde_ref(self):
         """Reference differential flux"""
-        result = self.reference_spectral_model(self.energy_axis.center)
-        return result[self._expand_slice]
+        return self._get_reference_flux(
+            "dnde_ref", lambda model: model(self.energy_axis.center)
+        )
 
     @property
     def e2dnde_ref(self):
         """Reference differential flux * energy ** 2"""
         energy = self.energy_axis.center
-        result = (
-                self.reference_spectral_model(energy) * energy ** 2
+        return self._get_reference_flux(
+            "e2dnde_ref", lambda model: model(energy) * energy ** 2
         )
-        return result[self._expand_slice]
 
     @property
     def flux_ref(self):
         """Reference integral flux"""
-        energy_min = self.energy_axis.edges[:-1]
-        energy_max = self.energy_axis.edges[1:]
-        result = self.reference_spectral_model.integral(energy_min, energy_max)
-        return result[self._expand_slice]
+        return self._get_reference_flux(
+            "flux_ref", lambda model: model.integral(self.energy_min, self.energy_max)
+        )
 
     @property
     def eflux_ref(self):
         """Reference energy flux"""
-        energy_min = self.energy_axis.edges[:-1]
-        energy_max = self.energy_axis.edges[1:]
-        result = self.reference_spectral_model.energy_flux(energy_min, energy_max)
-        return result[self._expand_slice]
+        return self._get_reference_flux(
+            "eflux_ref",
+            lambda model: model.energy_flux(self.energy_min, self.energy_max),
+        )
+
+    def _scale_norm(self, quantity, ref):
+        """Scale a norm quantity by a reference flux"""
+        norm = getattr(self, quantity)
+        # keep the floating point type of the norm, e.g. float32
+        dtype = np.result_type(norm.data.dtype, np.float32)
+        data = np.multiply(norm.data, ref.value, dtype=dtype)
+        return Map.from_geom(
+            geom=norm.geom, data=data, unit=norm.unit * ref.unit, meta=norm.meta.copy()
+        )
 
     @property
     def dnde(self):
         """Return differential flux (dnde) SED values."""
-        return self.norm * self.dnde_ref
+        return self._scale_norm("norm", self.dnde_ref)
 
     @property
     def dnde_err(self):
         """Return differential flux (dnde) SED errors."""
-        return self.norm_err * self.dnde_ref
+        return self._scale_norm("norm_err", self.dnde_ref)
 
     @property
     def dnde_errn(self):
         """Return differential flux (dnde) SED negative errors."""
-        return self.norm_errn * self.dnde_ref
+        return self._scale_norm("norm_errn", self.dnde_ref)
 
     @property
     def dnde_errp(self):
         """Return differential flux (dnde) SED positive errors."""
-        return self.norm_errp * self.dnde_ref
+        return self._scale_norm("norm_errp", self.dnde_ref)
 
     @property
     def dnde_ul(self):
         """Return differential flux (dnde) SED upper limit."""
-        return self.norm_ul * self.dnde_ref
+        return self._scale_norm("norm_ul", self.dnde_ref)
 
     @property
     def e2dnde(self):
         """Return differential energy flux (e2dnde) SED values."""
-        return self.norm * self.e2dnde_ref
+        return self._scale_norm("norm", self.e2dnde_ref)
 
     @property
     def e2dnde_err(self):
         """Return differential energy flux (e2dnde) SED errors."""
-        return self.norm_err * self.e2dnde_ref
+        return self._scale_norm("norm_err", self.e2dnde_ref)
 
     @property
     def e2dnde_errn(self):
         """Return differential energy flux (e2dnde) SED negative errors."""
-        return self.norm_errn * self.e2dnde_ref
+        return self._scale_norm("norm_errn", self.e2dnde_ref)
 
     @property
     def e2dnde_errp(self):
         """Return differential energy flux (e2dnde) SED positive errors."""
-        return self.norm_errp * self.e2dnde_ref
+        return self._scale_norm("norm_errp", self.e2dnde_ref)
 
     @property
     def e2dnde_ul(self):
         """Return differential energy flux (e2dnde) SED upper limit."""
-        return self.norm_ul * self.e2dnde_ref
+        return self._scale_norm("norm_ul", self.e2dnde_ref)
 
     @property
     def flux(self):
         """Return integral flux (flux) SED values."""
-        return self.norm * self.flux_ref
+        return self._scale_norm("norm", self.flux_ref)
 
     @property
     def flux_err(self):
         """Return integral flux (flux) SED values."""
-        return self.norm_err * self.flux_ref
+        return self._scale_norm("norm_err", self.flux_ref)
 
     @property
     def flux_errn(self):
         """Return integral flux (flux) SED negative errors."""
-        return self.norm_errn * self.flux_ref
+        return self._scale_norm("norm_errn", self.flux_ref)
 
     @property
     def flux_errp(self):
         """Return integral flux (flux) SED positive errors."""
-        return self.norm_errp * self.flux_ref
+        return self._scale_norm("norm_errp", self.flux_ref)
 
     @property
     def flux_ul(self):
         """Return integral flux (flux) SED upper limits."""
-        return self.norm_ul * self.flux_ref
+        return self._scale_norm("norm_ul", self.flux_ref)
 
     @property
     def eflux(self):
         """Return energy flux (eflux) SED values."""
-        return self.norm * self.eflux_ref
+        return self._scale_norm("norm", self.eflux_ref)
 
     @property
     def eflux_err(self):
         """Return energy flux (eflux) SED errors."""
-        return self.norm_err * self.eflux_ref
+        return self._scale_norm("norm_err", self.eflux_ref)
 
     @property
     def eflux_errn(self):
         """Return energy flux (eflux) SED negative errors."""
-        return self.norm_errn * self.eflux_ref
+        return self._scale_norm("norm_errn", self.eflux_ref)
 
     @property
     def eflux_errp(self):
         """Return energy flux (eflux) SED positive errors."""
-        return self.norm_errp * self.eflux_ref
+        return self._scale_norm("norm_errp", self.eflux_ref)
 
     @property
     def eflux_ul(self):
         """Return energy flux (eflux) SED upper limits."""
-        return self.norm_ul * self.eflux_ref
+        return self._scale_norm("norm_ul", self.eflux_ref)
 
     def get_flux_points(self, position=None):
         """Extract flux point at a given position.
@@ -564,6 +664,41 @@ class FluxMaps:
             gti=self.gti
         )
 
+    def get_flux_points_batch(self, positions, n_jobs=None):
+        """Extract flux points at a list of positions.
+
+        The flux maps are sent once to each worker process, so the memory used
+        scales with the number of processes and not with the number of positions.
+
+        Parameters
+        ----------
+        positions : `~astropy.coordinates.SkyCoord`
+            Positions where the flux points are extracted.
+        n_jobs : int
+            Number of processes used in parallel for the extraction.
+            Default is None, the positions are processed sequentially.
+
+        Returns
+        -------
+        flux_points : list of `~gammapy.estimators.FluxPoints`
+            Flux points objects, one per position.
+        """
+        if n_jobs is None:
+            results = [self.get_flux_points(position=_) for _ in positions]
+        else:
+            pool = Pool(
+                processes=n_jobs,
+                initializer=_init_flux_points_worker,
+                initargs=(self,),
+            )
+            with contextlib.closing(pool):
+                log.info(f"Using {n_jobs} jobs to extract flux points.")
+                results = pool.map(_get_flux_points, positions)
+
+            pool.join()
+
+        return results
+
     def to_maps(self, sed_type="likelihood"):
         """Return maps in a given SED type.
 
@@ -579,15 +714,15 @@ class FluxMaps:
         """
         maps = Maps()
 
-        for quantity in self.all_quantities(sed_type=sed_type):
-            m = getattr(self, quantity, None)
-            if m is not None:
-                maps[quantity] = m
+        for quantity in self._available_all_quantities(sed_type=sed_type):
+            maps[quantity] = getattr(self, quantity)
 
         return maps
 
     @classmethod
-    def from_maps(cls, maps, sed_type=None, reference_model=None, gti=None, meta=None):
+    def from_maps(
+        cls, maps, sed_type=None, reference_model=None, gti=None, meta=None, dtype=None
+    ):
         """Create FluxMaps from a dictionary of maps.
 
         Parameters
@@ -604,6 +739,9 @@ class FluxMaps:
             Maps GTI information. Default is None.
         meta : `dict`
             Meta dict.
+        dtype : str or `~numpy.dtype`
+            Data type of the norm maps, e.g. "float32" to reduce the memory
+            footprint. Default is None, which keeps the data type of the input maps.
 
         Returns
         -------
@@ -619,6 +757,12 @@ class FluxMaps:
         cls._validate_data(data=maps, sed_type=sed_type)
 
         if sed_type == "likelihood":
+            if dtype is not None:
+                names = REQUIRED_MAPS[sed_type] + OPTIONAL_QUANTITIES[sed_type]
+                maps = {
+                    key: m.copy(data=m.data.astype(dtype, copy=False)) if key in names else m
+                    for key, m in maps.items()
+                }
             return cls(data=maps, reference_model=reference_model, gti=gti, meta=meta)
 
         if reference_model is None:
@@ -636,15 +780,14 @@ class FluxMaps:
             fluxes = reference_model.spectral_model.reference_fluxes(energy_axis=energy_axis)
 
         # TODO: handle reshaping in MapAxis
-        factor = fluxes[f"ref_{sed_type}"].to(map_ref.unit)[cls._expand_slice]
+        factor = fluxes[f"ref_{sed_type}"][cls._expand_slice]
 
         data = dict()
-        data["norm"] = map_ref / factor
+        data["norm"] = cls._divide_by_factor(map_ref, factor, dtype=dtype)
 
-        for key in OPTIONAL_QUANTITIES[sed_type]:
+        for key, norm_type in _NORM_KEY_MAP[sed_type].items():
             if key in maps:
-                norm_type = key.replace(sed_type, "norm")
-                data[norm_type] = maps[key] / factor
+                data[norm_type] = cls._divide_by_factor(maps[key], factor, dtype=dtype)
 
         # We add the remaining maps
         for key in OPTIONAL_QUANTITIES_COMMON:
@@ -653,6 +796,17 @@ class FluxMaps:
 
         return cls(data=data, reference_model=reference_model, gti=gti, meta=meta)
 
+    @staticmethod
+    def _divide_by_factor(m, factor, dtype=None):
+        """Divide map by reference flux factor, converted to the map unit"""
+        if factor.unit == m.unit:
+            factor = factor.value
+        else:
+            factor = factor.to_value(m.unit)
+
+        data = np.divide(m.data, factor, dtype=dtype)
+        return Map.from_geom(geom=m.geom, data=data, meta=m.meta.copy())
+
     def to_hdulist(self, sed_type="likelihood", hdu_bands=None):
         """Convert flux map to list of HDUs.
 
@@ -749,10 +903,8 @@ class FluxMaps:
         filename = make_path(filename)
 
         if filename_model is None:
-            name_string = filename.as_posix()
-            for suffix in filename.suffixes:
-                name_string.replace(suffix, "")
-            filename_model = name_string + "_model.yaml"
+            name = filename.name.split(".")[0]
+            filename_model = filename.with_name(name + "_model.yaml")
 
         filename_model = make_path(filename_model)
 
@@ -765,20 +917,25 @@ class FluxMaps:
         hdulist.writeto(filename, overwrite=overwrite)
 
     @classmethod
-    def read(cls, filename):
+    def read(cls, filename, memmap=False):
         """Read map dataset from file.
 
         Parameters
         ----------
         filename : str
             Filename to read from.
+        memmap : bool
+            Whether to memory map the map data. Only the parts of the file
+            that are accessed are then loaded into memory, which is useful
+            for large "likelihood" type flux maps. Modifications of the data
+            are not written back to the file. Default is False.
 
         Returns
         -------
         flux_maps : `~gammapy.estimators.FluxMaps`
             Flux maps object.
         """
-        with fits.open(str(make_path(filename)), memmap=False) as hdulist:
+        with fits.open(str(make_path(filename)), memmap=memmap) as hdulist:
             return cls.from_hdulist(hdulist)
 
     # TODO: should we allow this?
@@ -786,16 +943,20 @@ class FluxMaps:
         return getattr(self, item)
 
     def __str__(self):
-        str_ = f"{self.__class__.__name__}\n"
-        str_ += "-" * len(self.__class__.__name__)
-        str_ += "\n\n"
-        str_ += "\t" + f"geom            : {self.geom.__class__.__name__}\n"
-        str_ += "\t" + f"axes            : {self.geom.axes_names}\n"
-        str_ += "\t" + f"shape           : {self.geom.data_shape[::-1]}\n"
-        str_ += "\t" + f"quantities      : {list(self.available_quantities)}\n"
-        str_ += "\t" + f"ref. model      : {self.reference_spectral_model.tag[-1]}\n"
-        str_ += "\t" + f"n_sigma         : {self.n_sigma}\n"
-        str_ += "\t" + f"n_sigma_ul      : {self.n_sigma_ul}\n"
-        str_ += "\t" + f"ts_threshold_ul : {self.ts_threshold_ul}\n"
-        str_ += "\t" + f"sed type init   : {self.sed_type_init}\n"
-        return str_.expandtabs(tabsize=2)
+        name = self.__class__.__name__
+        lines = [
+            name,
+            "-" * len(name),
+            "",
+            f"\tgeom            : {self.geom.__class__.__name__}",
+            f"\taxes            : {self.geom.axes_names}",
+            f"\tshape           : {self.geom.data_shape[::-1]}",
+            f"\tquantities      : {list(self.available_quantities)}",
+            f"\tref. model      : {self.reference_spectral_model.tag[-1]}",
+            f"\tn_sigma         : {self.n_sigma}",
+            f"\tn_sigma_ul      : {self.n_sigma_ul}",
+            f"\tts_threshold_ul : {self.ts_threshold_ul}",
+            f"\tsed type init   : {self.sed_type_init}",
+            "",
+        ]
+        return "\n".join(lines).expandtabs(tabsize=2)
@@ -1,20 +1,27 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
+import contextlib
+import functools
 import logging
+from multiprocessing import Pool
 import numpy as np
 from scipy import stats
 from astropy import units as u
-from astropy.io.registry import IORegistryError
-from astropy.table import Table, vstack
+from astropy.io.registry import IORegistryError, identify_format
+from astropy.table import Column, Table
+from astropy.utils.data import get_readable_fileobj
 from astropy.visualization import quantity_support
 from gammapy.datasets import Datasets
 from gammapy.modeling.models import TemplateSpectralModel
-from gammapy.modeling.models.spectral import scale_plot_flux
+from gammapy.modeling.models.spectral import _scale_plot_flux_factor
 from gammapy.modeling import Fit
-from gammapy.maps import RegionNDMap, Maps
-from gammapy.utils.interpolation import interpolate_profile
+from gammapy.maps import RegionNDMap, Maps, MapAxes
+from gammapy.utils.interpolation import interpolation_scale
 from gammapy.utils.scripts import make_path
 from gammapy.utils.pbar import progress_bar
-from gammapy.utils.table import table_from_row_data, table_standardise_units_copy
+from gammapy.utils.table import (
+    table_standardise_units_copy,
+    table_standardise_units_inplace,
+)
 from .flux_map import (
     FluxMaps,
     DEFAULT_UNIT,
@@ -26,6 +33,19 @@ __all__ = ["FluxPoints", "FluxPointsEstimator"]
 
 log = logging.getLogger(__name__)
 
+_FORMAT_PREFIXES = {
+    ".3e": ("dnde", "eflux", "flux", "e2dnde", "ref"),
+    ".3f": ("e_min", "e_max", "e_ref", "sqrt_ts", "norm", "ts", "stat"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _column_format(colname):
+    """Column format for a given column name, cached as names repeat across tables"""
+    for fmt, prefixes in _FORMAT_PREFIXES.items():
+        if colname.startswith(prefixes):
+            return fmt
+
 
 class FluxPoints(FluxMaps):
     """Flux points container.
@@ -114,7 +134,9 @@ class FluxPoints(FluxMaps):
     """
 
     @classmethod
-    def read(cls, filename, sed_type=None, reference_model=None, **kwargs):
+    def read(
+        cls, filename, sed_type=None, reference_model=None, memmap=False, **kwargs
+    ):
         """Read flux points.
 
         Parameters
@@ -125,6 +147,11 @@ class FluxPoints(FluxMaps):
             Sed type
         reference_model : `SpectralModel`
             Reference spectral model
+        memmap : bool
+            Memory map FITS tables instead of loading them into memory. Columns
+            not used by the flux points, e.g. in large catalog tables, are then
+            never read from disk. Ignored for other formats and for compressed
+            FITS files, which cannot be memory mapped. Default is False.
         **kwargs : dict
             Keyword arguments passed to `astropy.table.Table.read`.
 
@@ -135,17 +162,38 @@ class FluxPoints(FluxMaps):
         """
         filename = make_path(filename)
 
+        if "format" not in kwargs:
+            # identify the format from the file content, like `Table.read` does
+            with get_readable_fileobj(str(filename), encoding="binary") as fileobj:
+                formats = identify_format(
+                    "read", Table, str(filename), fileobj, [], {}
+                )
+
+            if "fits" in formats:
+                kwargs["format"] = "fits"
+
+        if kwargs.get("format") == "fits":
+            kwargs.setdefault("memmap", memmap)
+
         try:
             table = Table.read(filename, **kwargs)
         except IORegistryError:
             kwargs.setdefault("format", "ascii.ecsv")
             table = Table.read(filename, **kwargs)
 
-        return cls.from_table(table=table, sed_type=sed_type, reference_model=reference_model)
+        # the table is not shared with the caller, so the units are standardised
+        # in place and memory mapped columns are not copied
+        table = table_standardise_units_inplace(table)
+        return cls._from_standardised_table(
+            table=table, sed_type=sed_type, reference_model=reference_model
+        )
 
     def write(self, filename, sed_type="likelihood", **kwargs):
         """Write flux points.
 
+        If no format is given and it cannot be inferred from the filename
+        extension, the flux points are written as a FITS binary table.
+
         Parameters
         ----------
         filename : str
@@ -157,6 +205,12 @@ class FluxPoints(FluxMaps):
         """
         filename = make_path(filename)
         table = self.to_table(sed_type=sed_type)
+
+        if "format" not in kwargs and not identify_format(
+            "write", Table, str(filename), None, [], {}
+        ):
+            kwargs["format"] = "fits"
+
         table.write(filename, **kwargs)
 
     @classmethod
@@ -177,21 +231,38 @@ class FluxPoints(FluxMaps):
             Flux points without upper limit points.
         """
         reference = flux_points[0].to_table(sed_type="dnde")
+        colnames = reference.colnames
+        units = {name: reference[name].unit for name in colnames if reference[name].unit}
+        colnames_unitless = [name for name in colnames if name not in units]
 
-        tables = []
+        data = {name: [] for name in colnames}
 
         for fp in flux_points:
             table = fp.to_table(sed_type="dnde")
-            for colname in reference.colnames:
-                column = reference[colname]
-                if column.unit:
-                    table[colname] = table[colname].quantity.to(column.unit)
-            tables.append(table[reference.colnames])
-
-        table_stacked = vstack(tables)
-        table_stacked.meta["SED_TYPE"] = "dnde"
-        table_stacked.sort("e_ref")
-        return cls.from_table(table=table_stacked, sed_type="dnde")
+            for colname, unit in units.items():
+                column = table[colname]
+                if column.unit != unit:
+                    data[colname].append(column.data * column.unit.to(unit))
+                else:
+                    data[colname].append(column.data)
+
+            for colname in colnames_unitless:
+                data[colname].append(table[colname].data)
+
+        # all tables share the same schema, so the columns can be concatenated
+        # directly and sorted with a single permutation
+        data = {name: np.concatenate(values) for name, values in data.items()}
+        idx = np.argsort(data["e_ref"], kind="stable")
+
+        meta = reference.meta.copy()
+        meta["SED_TYPE"] = "dnde"
+
+        columns = [
+            Column(data[name][idx], name=name, unit=units.get(name))
+            for name in colnames
+        ]
+        table_stacked = Table(columns, meta=meta)
+        return cls._from_standardised_table(table=table_stacked, sed_type="dnde")
 
     @staticmethod
     def _convert_loglike_columns(table):
@@ -231,7 +302,17 @@ class FluxPoints(FluxMaps):
             Flux points
         """
         table = table_standardise_units_copy(table)
+        return cls._from_standardised_table(
+            table=table, sed_type=sed_type, reference_model=reference_model
+        )
+
+    @classmethod
+    def _from_standardised_table(cls, table, sed_type=None, reference_model=None):
+        """Create flux points from a table with standardised units.
 
+        The table is modified, so it must not be shared with the caller, e.g.
+        a copy or a table created internally.
+        """
         if sed_type is None:
             sed_type = table.meta.get("SED_TYPE", None)
 
@@ -252,10 +333,13 @@ class FluxPoints(FluxMaps):
         maps = Maps()
         table.meta.setdefault("SED_TYPE", sed_type)
 
+        # the axes are shared by all columns, so they are only parsed once
+        axes = MapAxes.from_table(table=table, format="gadf-sed")
+
         for name in cls.all_quantities(sed_type=sed_type):
             if name in table.colnames:
                 maps[name] = RegionNDMap.from_table(
-                    table=table, colname=name, format="gadf-sed"
+                    table=table, colname=name, format="gadf-sed", axes=axes
                 )
 
         meta = cls._get_meta_gadf(table)
@@ -280,12 +364,9 @@ class FluxPoints(FluxMaps):
     def _format_table(table):
         """Format table"""
         for column in table.colnames:
-            if column.startswith(("dnde", "eflux", "flux", "e2dnde", "ref")):
-                table[column].format = ".3e"
-            elif column.startswith(
-                ("e_min", "e_max", "e_ref", "sqrt_ts", "norm", "ts", "stat")
-            ):
-                table[column].format = ".3f"
+            fmt = _column_format(column)
+            if fmt:
+                table[column].format = fmt
 
         return table
 
@@ -321,10 +402,8 @@ class FluxPoints(FluxMaps):
                 table["ref_flux"] = self.flux_ref[idx]
                 table["ref_eflux"] = self.eflux_ref[idx]
 
-            for quantity in self.all_quantities(sed_type=sed_type):
-                data = getattr(self, quantity, None)
-                if data:
-                    table[quantity] = data.quantity[idx]
+            for quantity in self._available_all_quantities(sed_type=sed_type):
+                table[quantity] = getattr(self, quantity).quantity[idx]
 
             if self.has_stat_profiles:
                 norm_axis = self.stat_scan.geom.axes["norm"]
@@ -354,15 +433,16 @@ class FluxPoints(FluxMaps):
         """Compute flux error for given sed type"""
         y_errn, y_errp = None, None
 
-        if "norm_err" in self.available_quantities:
+        # asymmetric errors take precedence, so that the symmetric error
+        # map is only computed when it is actually used
+        if "norm_errp" in self._data:
+            y_errn = getattr(self, sed_type + "_errn")
+            y_errp = getattr(self, sed_type + "_errp")
+        elif "norm_err" in self._data:
             # symmetric error
             y_errn = getattr(self, sed_type + "_err")
             y_errp = y_errn.copy()
 
-        if "norm_errp" in self.available_quantities:
-            y_errn = getattr(self, sed_type + "_errn")
-            y_errp = getattr(self, sed_type + "_errp")
-
         return y_errn, y_errp
 
     def plot(
@@ -403,22 +483,28 @@ class FluxPoints(FluxMaps):
 
         is_ul = self.is_ul.data
         if y_errn and is_ul.any():
-            flux_ul = getattr(self, sed_type + "_ul").quantity
-            y_errn.data[is_ul] = 0.5 * flux_ul[is_ul].to_value(y_errn.unit)
-            y_errp.data[is_ul] = 0
-            flux.data[is_ul] = flux_ul[is_ul].to_value(flux.unit)
+            # resolve the mask to indices once, shared by all gathers below
+            idx_ul = np.nonzero(is_ul)
+            flux_ul = getattr(self, sed_type + "_ul").quantity[idx_ul]
+            y_errn.data[idx_ul] = 0.5 * flux_ul.to_value(y_errn.unit)
+            y_errp.data[idx_ul] = 0
+            flux.data[idx_ul] = flux_ul.to_value(flux.unit)
+
+        # the energy power factor is shared by the flux and its errors
+        flux = flux.to_unit(flux_unit)
+        factor, unit = _scale_plot_flux_factor(flux, energy_power=energy_power)
 
         # set flux points plotting defaults
         if y_errp:
-            y_errp = scale_plot_flux(y_errp, energy_power=energy_power).quantity
+            y_errp = y_errp.quantity.to_value(flux_unit) * factor * unit
 
         if y_errn:
-            y_errn = scale_plot_flux(y_errn, energy_power=energy_power).quantity
+            y_errn = y_errn.quantity.to_value(flux_unit) * factor * unit
 
         kwargs.setdefault("yerr", (y_errn, y_errp))
         kwargs.setdefault("uplims", is_ul)
 
-        flux = scale_plot_flux(flux=flux.to_unit(flux_unit), energy_power=energy_power)
+        flux = flux.copy(data=flux.data * factor, unit=unit)
         ax = flux.plot(ax=ax, **kwargs)
         ax.set_yscale("log", nonpositive="clip")
         ax.set_ylabel(f"{sed_type} ({ax.yaxis.units})")
@@ -460,17 +546,23 @@ class FluxPoints(FluxMaps):
 
         flux = np.geomspace(0.2 * flux_ref.min(), 5 * flux_ref.max(), 500)
 
-        ts = self.stat_scan - np.expand_dims(self.stat.data, 2)
-        norm_scan = ts.geom.axes["norm"].center.to_value("")
+        ts = self.stat_scan.data[..., 0, 0] - self.stat.data[..., 0]
+        norm_scan = self.stat_scan.geom.axes["norm"].center.to_value("")
+
+        norm = (np.sqrt(flux[:-1] * flux[1:]) / flux_ref[:, :, 0]).to_value("")
 
-        norm = np.sqrt(flux[:-1] * flux[1:]) / flux_ref[:, :, 0]
+        # linear interpolation of all profiles on a sqrt scale at once,
+        # equivalent to applying `interpolate_profile` to each energy bin
+        scale = interpolation_scale("sqrt")
+        values = scale(np.sign(np.gradient(ts, axis=1)) * ts)
 
-        z = np.empty(norm.shape)
+        idx = np.clip(np.searchsorted(norm_scan, norm) - 1, 0, len(norm_scan) - 2)
+        x_lo, x_hi = norm_scan[idx], norm_scan[idx + 1]
+        y_lo = np.take_along_axis(values, idx, axis=1)
+        y_hi = np.take_along_axis(values, idx + 1, axis=1)
 
-        for idx, profile in ts.iter_by_axis(axis_name="norm"):
-            idx = idx[:-2]
-            interp = interpolate_profile(norm_scan, profile)
-            z[idx] = interp((norm[idx],))
+        weights = (norm - x_lo) / (x_hi - x_lo)
+        z = np.clip(scale.inverse(y_lo + weights * (y_hi - y_lo)), 0, np.inf)
 
         kwargs.setdefault("vmax", 0)
         kwargs.setdefault("vmin", -4)
@@ -502,6 +594,36 @@ class FluxPoints(FluxMaps):
         return ax
 
 
+# estimator and datasets of a worker process in `FluxPointsEstimator.run`
+_WORKER_ESTIMATOR = None
+_WORKER_DATASETS = None
+
+
+def _init_flux_point_worker(estimator, datasets):
+    """Helper function to send the estimator and datasets once to each worker process"""
+    global _WORKER_ESTIMATOR, _WORKER_DATASETS
+    _WORKER_ESTIMATOR = estimator
+    _WORKER_DATASETS = datasets
+
+
+def _estimate_flux_point(energy_range):
+    """Helper function for multiprocessing in `FluxPointsEstimator.run`"""
+    energy_min, energy_max = energy_range
+    return _WORKER_ESTIMATOR.estimate_flux_point(
+        _WORKER_DATASETS, energy_min=energy_min, energy_max=energy_max
+    )
+
+
+def _empty_column(value, n_rows):
+    """Allocate a column matching shape, dtype and unit of a single row value"""
+    data = np.empty((n_rows,) + np.shape(value), dtype=np.asarray(value).dtype)
+
+    if isinstance(value, u.Quantity):
+        data = u.Quantity(data, unit=value.unit, copy=False)
+
+    return data
+
+
 class FluxPointsEstimator(FluxEstimator):
     """Flux points estimator.
 
@@ -550,6 +672,9 @@ class FluxPointsEstimator(FluxEstimator):
         Fit instance specifying the backend and fit options.
     reoptimize : bool
         Re-optimize other free model parameters. Default is True.
+    n_jobs : int
+        Number of processes used in parallel for the computation of the
+        energy bins. Default is None, the energy bins are processed sequentially.
     """
 
     tag = "FluxPointsEstimator"
@@ -558,9 +683,11 @@ class FluxPointsEstimator(FluxEstimator):
     def __init__(
         self,
         energy_edges=[1, 10] * u.TeV,
+        n_jobs=None,
         **kwargs
     ):
         self.energy_edges = energy_edges
+        self.n_jobs = n_jobs
 
         fit = Fit(confidence_opts={"backend": "scipy"})
         kwargs.setdefault("fit", fit)
@@ -579,19 +706,53 @@ class FluxPointsEstimator(FluxEstimator):
         flux_points : `FluxPoints`
             Estimated flux points.
         """
-        # TODO: remove copy here...
-        datasets = Datasets(datasets).copy()
+        # no copy needed, the input datasets are only sliced and the models
+        # are copied in `FluxEstimator.run` before they are modified
+        datasets = Datasets(datasets)
 
-        rows = []
+        n_bins = len(self.energy_edges) - 1
+        energy_ranges = list(zip(self.energy_edges[:-1], self.energy_edges[1:]))
 
-        for energy_min, energy_max in progress_bar(
-            zip(self.energy_edges[:-1], self.energy_edges[1:]),
-            desc="Energy bins"
-        ):
-            row = self.estimate_flux_point(
-                datasets, energy_min=energy_min, energy_max=energy_max,
+        if self.n_jobs is None:
+            rows = (
+                self.estimate_flux_point(
+                    datasets, energy_min=energy_min, energy_max=energy_max
+                )
+                for energy_min, energy_max in progress_bar(
+                    energy_ranges, desc="Energy bins"
+                )
+            )
+        else:
+            # the estimator and datasets are sent once to each worker, the
+            # tasks only contain the energy range
+            pool = Pool(
+                processes=self.n_jobs,
+                initializer=_init_flux_point_worker,
+                initargs=(self, datasets),
             )
-            rows.append(row)
+            with contextlib.closing(pool):
+                log.info(f"Using {self.n_jobs} jobs to compute flux points.")
+                rows = list(
+                    progress_bar(
+                        pool.imap(_estimate_flux_point, energy_ranges),
+                        desc="Energy bins",
+                        total=len(energy_ranges),
+                    )
+                )
+
+            pool.join()
+
+        columns = {}
+
+        for idx, row in enumerate(rows):
+            if idx == 0:
+                columns = {
+                    name: _empty_column(value, n_rows=n_bins)
+                    for name, value in row.items()
+                }
+
+            for name, value in row.items():
+                columns[name][idx] = value
 
         meta = {
             "n_sigma": self.n_sigma,
@@ -599,9 +760,11 @@ class FluxPointsEstimator(FluxEstimator):
             "SED_TYPE": "likelihood"
         }
 
-        table = table_from_row_data(rows=rows, meta=meta)
+        table = Table(columns, meta=meta)
         model = datasets.models[self.source]
-        return FluxPoints.from_table(table, reference_model=model.copy())
+        return FluxPoints._from_standardised_table(
+            table, reference_model=model.copy()
+        )
 
     def estimate_flux_point(self, datasets, energy_min, energy_max):
         """Estimate flux point for a single energy group.
@@ -622,5 +785,7 @@ class FluxPointsEstimator(FluxEstimator):
             energy_min=energy_min, energy_max=energy_max
         )
 
-        datasets_sliced.models = datasets.models.copy()
+        # no copy needed, `FluxEstimator.run` copies the models before
+        # replacing the source spectral model by the scale model
+        datasets_sliced.models = datasets.models
         return super().run(datasets=datasets_sliced)
\ No newline at end of file
@@ -76,7 +76,7 @@ class ParameterEstimator(Estimator):
         result : dict
             Dict with the various parameter estimation values.
         """
-        value, total_stat, success, error = np.nan, 0, False, np.nan
+        value, total_stat, success, error = np.nan, 0.0, False, np.nan
 
         if np.any(datasets.contributes_to_stat):
             result = self.fit.run(datasets=datasets)
@@ -239,13 +239,19 @@ class ParameterEstimator(Estimator):
             Dict with an array with one entry per dataset with the sum of the
             masked counts.
         """
-        counts = []
+        counts = np.empty(len(datasets), dtype=np.int64)
 
-        for dataset in datasets:
+        for idx, dataset in enumerate(datasets):
             mask = dataset.mask
-            counts.append(dataset.counts.data[mask].sum())
 
-        return {"counts": np.array(counts, dtype=int)}
+            # the datasets are already sliced in energy, so the mask can be
+            # applied as a reduction mask without gathering the selected bins
+            if mask is None:
+                counts[idx] = dataset.counts.data.sum()
+            else:
+                counts[idx] = np.sum(dataset.counts.data, where=mask.data)
+
+        return {"counts": counts}
 
     def run(self, datasets, parameter):
         """Run the parameter estimator.
@@ -233,6 +233,7 @@ def test_flux_map_read_write(tmp_path, wcs_flux_map, logpar_reference_model, sed
     fluxmap.write(tmp_path / "tmp.fits", sed_type=sed_type)
     new_fluxmap = FluxMaps.read(tmp_path / "tmp.fits")
 
+    assert (tmp_path / "tmp_model.yaml").exists()
     assert_allclose(new_fluxmap.norm.data[:,0,0], [1, 1])
     assert_allclose(new_fluxmap.norm_err.data[:,0,0], [0.1, 0.1])
     assert_allclose(new_fluxmap.norm_errn.data[:,0,0], [0.2, 0.2])
@@ -270,6 +271,17 @@ def test_partial_flux_map_read_write(tmp_path, partial_wcs_flux_map, reference_m
         new_fluxmap.ts
 
 
+def test_flux_map_read_memmap(tmp_path, wcs_flux_map, reference_model):
+    fluxmap = FluxMaps(wcs_flux_map, reference_model)
+
+    fluxmap.write(tmp_path / "tmp.fits")
+    new_fluxmap = FluxMaps.read(tmp_path / "tmp.fits", memmap=True)
+
+    assert_allclose(new_fluxmap.norm.data[:, 0, 0], [1, 1])
+    assert_allclose(new_fluxmap.dnde.data[:, 0, 0], [1e-11, 1e-13])
+    assert_allclose(new_fluxmap.ts.data[:, 0, 0], [0, 3])
+
+
 def test_flux_map_read_write_gti(tmp_path, partial_wcs_flux_map, reference_model):
     start = u.Quantity([1, 2], "min")
     stop = u.Quantity([1.5, 2.5], "min")
@@ -374,3 +386,87 @@ def test_flux_map_from_dict_inconsistent_units(wcs_flux_map, reference_model):
     assert_allclose(flux_map.norm_err.data, 0.1)
     assert flux_map.norm_err.unit == ""
 
+
+def test_flux_map_reference_cache(wcs_flux_map):
+    model = SkyModel(PowerLawSpectralModel(amplitude="1e-10 cm-2s-1TeV-1", index=2))
+    fluxmap = FluxMaps(wcs_flux_map, model)
+
+    assert fluxmap.dnde_ref is fluxmap.dnde_ref
+    assert_allclose(fluxmap.dnde.data[:, 0, 0], [1e-9, 1e-11])
+
+    model.spectral_model.amplitude.value = 2e-10
+    assert_allclose(fluxmap.dnde.data[:, 0, 0], [2e-9, 2e-11])
+    assert fluxmap.dnde_ref is fluxmap.dnde_ref
+
+    model.spectral_model = PowerLawSpectralModel(amplitude="3e-10 cm-2s-1TeV-1")
+    assert_allclose(fluxmap.dnde.data[:, 0, 0], [3e-9, 3e-11])
+
+    fluxmap.reset_cache()
+    assert_allclose(fluxmap.dnde.data[:, 0, 0], [3e-9, 3e-11])
+
+
+def test_flux_map_sqrt_ts(map_flux_estimate, reference_model):
+    data = map_flux_estimate.copy()
+    data["norm"] = data["norm"].copy()
+    data["norm"].data[1] = -1.0
+    data["norm"].data[:, 0, 0] = [0, np.nan]
+    data["ts"] = data["norm"].copy(data=4.0)
+    fluxmap = FluxMaps(data, reference_model)
+
+    assert_allclose(fluxmap.sqrt_ts.data[:, 2, 2], [2, -2])
+    # a norm of zero or NaN gives a negative sqrt(TS)
+    assert_allclose(fluxmap.sqrt_ts.data[:, 0, 0], [-2, -2])
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_get_flux_points_batch(wcs_flux_map, reference_model, n_jobs):
+    fluxmap = FluxMaps(wcs_flux_map, reference_model)
+
+    positions = SkyCoord([0, 0.2], [0, 0.2], unit="deg", frame="galactic")
+    fps = fluxmap.get_flux_points_batch(positions, n_jobs=n_jobs)
+
+    assert len(fps) == 2
+    for fp in fps:
+        table = fp.to_table()
+        assert_allclose(table["norm"], [1, 1])
+        assert_allclose(table["ts"], [0, 3], atol=1e-15)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+@pytest.mark.parametrize("sed_type", ["likelihood", "dnde"])
+def test_flux_map_from_maps_dtype(wcs_flux_map, reference_model, sed_type, dtype):
+    fluxmap = FluxMaps(wcs_flux_map, reference_model)
+    maps = fluxmap.to_maps(sed_type=sed_type)
+
+    new_fluxmap = FluxMaps.from_maps(
+        maps, sed_type=sed_type, reference_model=reference_model, dtype=dtype
+    )
+
+    assert new_fluxmap.norm.data.dtype == dtype
+    assert new_fluxmap.norm_err.data.dtype == dtype
+    assert new_fluxmap.dnde.data.dtype == dtype
+    assert new_fluxmap.flux_err.data.dtype == dtype
+    assert_allclose(new_fluxmap.norm.data[:, 0, 0], [1, 1], rtol=1e-6)
+    assert_allclose(new_fluxmap.norm_err.data[:, 0, 0], [0.1, 0.1], rtol=1e-6)
+    assert_allclose(new_fluxmap.ts.data[:, 0, 0], [0, 3])
+
+
+def test_flux_map_npred_excess(map_flux_estimate, reference_model):
+    data = map_flux_estimate.copy()
+    data["npred"] = data["norm"].copy(data=5.0)
+    data["npred_null"] = data["norm"].copy(data=2.0)
+    fluxmap = FluxMaps(data, reference_model)
+
+    npred_excess = fluxmap.npred_excess
+    assert_allclose(npred_excess.data, 3)
+    assert npred_excess.geom == fluxmap.geom
+
+
+def test_flux_map_to_maps_available(partial_wcs_flux_map, reference_model):
+    fluxmap = FluxMaps(partial_wcs_flux_map, reference_model)
+
+    maps = fluxmap.to_maps(sed_type="dnde")
+    assert list(maps.keys()) == ["dnde", "dnde_err", "sqrt_ts"]
+
+    maps = fluxmap.to_maps(sed_type="likelihood")
+    assert list(maps.keys()) == ["norm", "norm_err", "sqrt_ts"]
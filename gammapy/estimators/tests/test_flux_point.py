@@ -6,7 +6,7 @@ import astropy.units as u
 from astropy.table import Table
 from gammapy.catalog.fermi import SourceCatalog3FGL
 from gammapy.estimators import FluxPoints
-from gammapy.modeling.models import SpectralModel
+from gammapy.modeling.models import PowerLawSpectralModel, SpectralModel
 from gammapy.utils.testing import (
     assert_quantity_allclose,
     mpl_plot_check,
@@ -156,6 +156,121 @@ def test_fermi_to_dnde():
     )
 
 
+def make_flux_points_dnde(energy_min, energy_max, unit):
+    amplitude = u.Quantity(1e-12, "cm-2 s-1 TeV-1").to(unit)
+    model = PowerLawSpectralModel(amplitude=amplitude)
+    energy = np.geomspace(energy_min, energy_max, 4) * u.TeV
+
+    table = Table()
+    table["e_min"] = energy[:-1]
+    table["e_max"] = energy[1:]
+    table["e_ref"] = np.sqrt(energy[:-1] * energy[1:])
+    table["dnde"] = model(table["e_ref"].quantity).to(unit)
+    table["dnde_err"] = 0.1 * table["dnde"].quantity
+    table.meta["SED_TYPE"] = "dnde"
+    return FluxPoints.from_table(table, reference_model=model)
+
+
+def test_flux_points_from_stack():
+    fp_low = make_flux_points_dnde(1, 10, "cm-2 s-1 TeV-1")
+    fp_high = make_flux_points_dnde(10, 100, "m-2 s-1 GeV-1")
+
+    fp = FluxPoints.from_stack([fp_high, fp_low])
+    table = fp.to_table(sed_type="dnde")
+
+    assert len(table) == 6
+    assert table["dnde"].unit == "cm-2 s-1 TeV-1"
+    assert_allclose(table["e_min"], [1, 2.154435, 4.641589, 10, 21.544347, 46.415888], rtol=1e-6)
+    desired = PowerLawSpectralModel()(table["e_ref"].quantity)
+    assert_quantity_allclose(table["dnde"].quantity, desired)
+    assert_quantity_allclose(table["dnde_err"].quantity, 0.1 * desired)
+
+
+@requires_dependency("matplotlib")
+def test_flux_points_plot_ts_profiles_no_data():
+    model = PowerLawSpectralModel()
+    energy = np.geomspace(1, 100, 6) * u.TeV
+    norm_scan = np.linspace(0.2, 5, 11)
+
+    table = Table()
+    table["e_min"] = energy[:-1]
+    table["e_max"] = energy[1:]
+    table["e_ref"] = np.sqrt(energy[:-1] * energy[1:])
+    table["ref_dnde"] = model(table["e_ref"].quantity)
+    table["ref_flux"] = model.integral(energy[:-1], energy[1:])
+    table["ref_eflux"] = model.energy_flux(energy[:-1], energy[1:])
+    table["norm"] = [0.8, 1.2, 1.0, 1.1, 0.9]
+    table["norm_scan"] = np.tile(norm_scan, (5, 1))
+    table["stat_scan"] = (norm_scan - table["norm"][:, np.newaxis]) ** 2 / 0.1
+    table["stat"] = np.zeros(5)
+    table.meta["SED_TYPE"] = "likelihood"
+
+    flux_points = FluxPoints.from_table(table)
+
+    with mpl_plot_check():
+        ax = flux_points.plot_ts_profiles()
+
+    z = ax.collections[0].get_array()
+    assert np.nanmin(z) >= -4
+    assert_allclose(np.nanmax(z), 0, atol=1e-2)
+
+
+@requires_dependency("matplotlib")
+def test_flux_points_plot_asymmetric_errors():
+    table = Table()
+    table["e_ref"] = [1, 3, 10] * u.TeV
+    table["dnde"] = [1e-12, 2e-13, 1e-14] * u.Unit("cm-2 s-1 TeV-1")
+    table["dnde_err"] = 0.5 * table["dnde"].quantity
+    table["dnde_errn"] = 0.1 * table["dnde"].quantity
+    table["dnde_errp"] = 0.2 * table["dnde"].quantity
+    table.meta["SED_TYPE"] = "dnde"
+
+    flux_points = FluxPoints.from_table(table)
+
+    y_errn, y_errp = flux_points._plot_get_flux_err(sed_type="dnde")
+    assert_allclose(y_errn.data.squeeze(), table["dnde_errn"])
+    assert_allclose(y_errp.data.squeeze(), table["dnde_errp"])
+
+    with mpl_plot_check():
+        flux_points.plot(energy_power=2)
+
+
+def test_flux_points_write_default_fits(tmp_path):
+    table = Table()
+    table["e_ref"] = [1, 3, 10] * u.TeV
+    table["dnde"] = [1e-12, 2e-13, 1e-14] * u.Unit("cm-2 s-1 TeV-1")
+    table.meta["SED_TYPE"] = "dnde"
+    flux_points = FluxPoints.from_table(table)
+
+    filename = tmp_path / "flux_points.dat"
+    flux_points.write(filename, sed_type="dnde")
+
+    with open(filename, "rb") as fh:
+        assert fh.read(6) == b"SIMPLE"
+
+    actual = FluxPoints.read(filename)
+    assert_allclose(actual.dnde.data, flux_points.dnde.data)
+
+
+@pytest.mark.parametrize(
+    "filename", ["flux_points.fits", "flux_points.fit", "flux_points.dat"]
+)
+def test_flux_points_read_memmap(tmp_path, filename):
+    table = Table()
+    table["e_ref"] = [1, 3, 10] * u.TeV
+    table["dnde"] = [1e-12, 2e-13, 1e-14] * u.Unit("cm-2 s-1 TeV-1")
+    table.meta["SED_TYPE"] = "dnde"
+    flux_points = FluxPoints.from_table(table)
+
+    # FITS files are identified from their content, not the file extension
+    filename = tmp_path / filename
+    flux_points.write(filename, sed_type="dnde", format="fits")
+
+    actual = FluxPoints.read(filename, memmap=True)
+    assert_allclose(actual.dnde.data, flux_points.dnde.data)
+    assert actual.dnde.unit == "cm-2 s-1 TeV-1"
+
+
 @pytest.fixture(params=FLUX_POINTS_FILES, scope="session")
 def flux_points(request):
     path = "$GAMMAPY_DATA/tests/spectrum/flux_points/" + request.param
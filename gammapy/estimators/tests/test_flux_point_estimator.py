@@ -5,7 +5,7 @@ from numpy.testing import assert_allclose
 from astropy import units as u
 from astropy.coordinates import SkyCoord
 from gammapy.data import Observation
-from gammapy.datasets import MapDataset, SpectrumDatasetOnOff
+from gammapy.datasets import Datasets, MapDataset, SpectrumDatasetOnOff
 from gammapy.estimators import FluxPointsEstimator
 from gammapy.irf import EDispKernelMap, EffectiveAreaTable2D, load_cta_irfs
 from gammapy.makers import MapDatasetMaker
@@ -361,6 +361,7 @@ def test_no_likelihood_contribution():
     assert np.isnan(table["norm"]).all()
     assert np.isnan(table["norm_err"]).all()
     assert_allclose(table["counts"], 0)
+    assert table["stat"].dtype == np.float64
 
 
 def test_mask_shape():
@@ -391,3 +392,54 @@ def test_mask_shape():
     table = fp.to_table()
 
     assert_allclose(table["counts"], 0)
+
+
+@requires_dependency("iminuit")
+def test_flux_points_estimator_n_jobs():
+    model = SkyModel(spectral_model=PowerLawSpectralModel(), name="source")
+    dataset = simulate_spectrum_dataset(model)
+
+    fpe = FluxPointsEstimator(
+        energy_edges=[0.5, 2, 10] * u.TeV, source="source", selection_optional=["ul"]
+    )
+    table = fpe.run(dataset).to_table()
+
+    fpe.n_jobs = 2
+    table_parallel = fpe.run(dataset).to_table()
+
+    assert_allclose(table_parallel["norm"], table["norm"])
+    assert_allclose(table_parallel["norm_ul"], table["norm_ul"])
+    assert_allclose(table_parallel["counts"], table["counts"])
+
+
+def test_flux_points_estimator_models_unchanged():
+    model = SkyModel(spectral_model=PowerLawSpectralModel(), name="source")
+    dataset = simulate_spectrum_dataset(model)
+    datasets = Datasets([dataset])
+
+    fpe = FluxPointsEstimator(energy_edges=[0.5, 2, 10] * u.TeV, source="source")
+    _ = fpe.estimate_flux_point(datasets, energy_min=0.5 * u.TeV, energy_max=2 * u.TeV)
+
+    spectral_model = datasets.models["source"].spectral_model
+    assert isinstance(spectral_model, PowerLawSpectralModel)
+    assert_allclose(spectral_model.amplitude.value, 1e-12)
+    assert not spectral_model.amplitude.frozen
+
+
+@requires_dependency("iminuit")
+def test_flux_points_estimator_run_datasets_unchanged():
+    model = SkyModel(spectral_model=PowerLawSpectralModel(), name="source")
+    dataset = simulate_spectrum_dataset(model)
+    datasets = Datasets([dataset])
+    mask_safe = dataset.mask_safe.data.copy()
+
+    fpe = FluxPointsEstimator(
+        energy_edges=[0.5, 2, 10] * u.TeV, source="source", reoptimize=True
+    )
+    fpe.run(datasets)
+
+    spectral_model = datasets.models["source"].spectral_model
+    assert isinstance(spectral_model, PowerLawSpectralModel)
+    assert_allclose(spectral_model.amplitude.value, 1e-12)
+    assert_allclose(spectral_model.index.value, 2)
+    assert_allclose(dataset.mask_safe.data, mask_safe)
@@ -1,9 +1,12 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
 import pytest
-from numpy.testing import assert_allclose
-from gammapy.datasets import Datasets, SpectrumDatasetOnOff
+import numpy as np
+import astropy.units as u
+from numpy.testing import assert_allclose, assert_equal
+from gammapy.datasets import Datasets, SpectrumDataset, SpectrumDatasetOnOff
 from gammapy.estimators.parameter import ParameterEstimator
 from gammapy.modeling.models import PowerLawSpectralModel, SkyModel
+from gammapy.maps import MapAxis, RegionGeom
 from gammapy.modeling import Fit
 from gammapy.utils.testing import requires_data
 
@@ -71,3 +74,19 @@ def test_parameter_estimator_3d_no_reoptimization(crab_datasets_fermi):
     assert_allclose(result["amplitude"], 0.018251, rtol=1e-3)
     assert_allclose(result["amplitude_scan"].shape, 10)
     assert_allclose(result["amplitude_scan"][0], 0.017282, atol=1e-3)
+
+
+def test_parameter_estimator_counts():
+    axis = MapAxis.from_energy_bounds("1 TeV", "10 TeV", nbin=4)
+    geom = RegionGeom.create("icrs;circle(0, 0, 0.1)", axes=[axis])
+
+    dataset = SpectrumDataset.create(geom=geom)
+    dataset.counts.data = np.arange(1, 5).reshape((4, 1, 1))
+    dataset.mask_safe = None
+
+    dataset_masked = dataset.copy()
+    dataset_masked.mask_safe = dataset.counts.geom.energy_mask(energy_min=3 * u.TeV)
+
+    result = ParameterEstimator.estimate_counts([dataset, dataset_masked])
+    assert_equal(result["counts"], [10, 7])
+    assert result["counts"].dtype == np.int64
@@ -491,7 +491,7 @@ class RegionNDMap(Map):
         return hdulist
 
     @classmethod
-    def from_table(cls, table, format="", colname=None):
+    def from_table(cls, table, format="", colname=None, axes=None):
         """Create region map from table
 
         Parameters
@@ -502,6 +502,10 @@ class RegionNDMap(Map):
             Format to use
         colname : str
             Column name to take the data from.
+        axes : `MapAxes`
+            Axes of the table, if already known. This avoids parsing them again
+            when creating maps from several columns of the same table. Default
+            is None, which reads the axes from the table.
 
         Returns
         -------
@@ -512,7 +516,8 @@ class RegionNDMap(Map):
             if colname is None:
                 raise ValueError(f"Column name required")
 
-            axes = MapAxes.from_table(table=table, format=format)
+            if axes is None:
+                axes = MapAxes.from_table(table=table, format=format)
 
             if colname == "stat_scan":
                 axes = axes
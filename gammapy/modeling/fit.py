@@ -129,6 +129,13 @@ class Fit:
         """Iminuit object"""
         return self._minuit
 
+    def __getstate__(self):
+        # the iminuit object holds a reference to the likelihood function of
+        # the last optimization and cannot be pickled
+        state = self.__dict__.copy()
+        state["_minuit"] = None
+        return state
+
     @staticmethod
     def _parse_datasets(datasets):
         from gammapy.datasets import Datasets
@@ -36,13 +36,29 @@ def scale_plot_flux(flux, energy_power=0):
     flux : `Map`
         Scaled flux map
     """
+    factor, unit = _scale_plot_flux_factor(flux, energy_power=energy_power)
+    return flux.copy(data=flux.data * factor, unit=unit)
+
+
+def _scale_plot_flux_factor(flux, energy_power=0):
+    """Energy power factor and resulting unit used by `scale_plot_flux`"""
+    if energy_power == 0:
+        return 1, flux.unit
+
     energy = flux.geom.get_coord(sparse=True)["energy"]
     try:
         eunit = [_ for _ in flux.unit.bases if _.physical_type == "energy"][0]
     except IndexError:
         eunit = energy.unit
-    y = flux * np.power(energy, energy_power)
-    return y.to_unit(flux.unit * eunit ** energy_power)
+    factor = np.power(energy.to_value(eunit), energy_power)
+    return factor, flux.unit * eunit ** energy_power
+
+
+def _has_float_fast_path(energy, *parameters):
+    """Whether `evaluate` can run on plain values for a quantity energy and scalar parameters"""
+    return isinstance(energy, u.Quantity) and all(
+        isinstance(par, u.Quantity) and par.isscalar for par in parameters
+    )
 
 
 def integrate_spectrum(func, energy_min, energy_max, ndecade=100):
@@ -62,12 +78,133 @@ def integrate_spectrum(func, energy_min, energy_max, ndecade=100):
         Number of grid points per decade used for the integration.
         Default : 100
     """
-    num = np.max(ndecade * np.log10(energy_max / energy_min))
-    energy = np.geomspace(energy_min, energy_max, num=int(num), axis=-1)
+    energy = _integration_energy_grid(energy_min, energy_max, ndecade)
     integral = trapz_loglog(func(energy), energy, axis=-1)
     return integral.sum(axis=0)
 
 
+def _integration_energy_grid(energy_min, energy_max, ndecade=100):
+    """Log spaced energy grid used by `integrate_spectrum`"""
+    num = np.max(ndecade * np.log10(energy_max / energy_min))
+    return np.geomspace(energy_min, energy_max, num=int(num), axis=-1)
+
+
+# Gauss-Legendre nodes and weights on [-1, 1], computed once
+_GAUSS_LEGENDRE_NODES, _GAUSS_LEGENDRE_WEIGHTS = np.polynomial.legendre.leggauss(16)
+
+
+def integrate_spectrum_gauss_legendre(func, energy_min, energy_max):
+    """Integrate 1d function using a composite Gauss-Legendre rule in log energy.
+
+    The integration range is split into one interval per decade and each
+    interval is integrated with a 16 point Gauss-Legendre rule. For smooth
+    spectra this is much more precise than `integrate_spectrum`, for a
+    comparable number of function evaluations.
+
+    Parameters
+    ----------
+    func : callable
+        Function to integrate.
+    energy_min : `~astropy.units.Quantity`
+        Integration range minimum
+    energy_max : `~astropy.units.Quantity`
+        Integration range maximum
+    """
+    unit = energy_min.unit
+    log_min = np.log(energy_min.value)
+    log_max = np.log(energy_max.to_value(unit))
+
+    n_decades = np.max((log_max - log_min) / np.log(10))
+    n_intervals = max(int(np.ceil(n_decades)), 1)
+
+    log_edges = np.linspace(log_min, log_max, n_intervals + 1, axis=-1)
+    log_lo, log_hi = log_edges[..., :-1, np.newaxis], log_edges[..., 1:, np.newaxis]
+
+    half_width = 0.5 * (log_hi - log_lo)
+    energy = np.exp(0.5 * (log_hi + log_lo) + half_width * _GAUSS_LEGENDRE_NODES)
+    energy = u.Quantity(energy, unit, copy=False)
+
+    # dE = E d(log E)
+    values = func(energy) * energy * half_width * _GAUSS_LEGENDRE_WEIGHTS
+    return values.sum(axis=(-2, -1))
+
+
+def integrate_log_parabola(
+    energy_min, energy_max, amplitude, reference, alpha, beta, evaluate, energy_power=0
+):
+    r"""Integrate log parabola multiplied by a power of energy.
+
+    For :math:`\beta > 0` the integral is computed analytically by completing
+    the square in :math:`u = \log(E / E_0)`:
+
+    .. math::
+        \int_{E_{min}}^{E_{max}} E^{p} \phi(E) dE = \phi_0 E_0^{p + 1}
+        \int_{u_{min}}^{u_{max}} \exp(-\gamma u - \beta u^2) du
+        \quad \text{with} \quad \gamma = \alpha - 1 - p
+
+    The resulting difference of error functions is evaluated with the scaled
+    complementary error function, to avoid overflow and cancellation in the
+    tails of the spectrum. Otherwise the integral is computed numerically with
+    `integrate_spectrum`.
+
+    Parameters
+    ----------
+    energy_min, energy_max : `~astropy.units.Quantity`
+        Lower and upper bound of integration range.
+    amplitude, reference, alpha, beta : `~astropy.units.Quantity`
+        Log parabola parameters.
+    evaluate : callable
+        Log parabola evaluation function, used for the numerical integration.
+    energy_power : int
+        Power of energy to multiply the log parabola with.
+
+    Returns
+    -------
+    integral : `~astropy.units.Quantity`
+        Integral
+    """
+    beta_value = u.Quantity(beta).to_value("")
+
+    if not np.all(beta_value > 0):
+
+        def f(energy):
+            return energy ** energy_power * evaluate(
+                energy, amplitude, reference, alpha, beta
+            )
+
+        return integrate_spectrum(f, energy_min, energy_max)
+
+    gamma = u.Quantity(alpha).to_value("") - 1 - energy_power
+
+    with np.errstate(divide="ignore"):
+        u_min = np.log((energy_min / reference).to_value(""))
+        u_max = np.log((energy_max / reference).to_value(""))
+
+    sqrt_beta = np.sqrt(beta_value)
+    s_min = sqrt_beta * u_min + gamma / (2 * sqrt_beta)
+    s_max = sqrt_beta * u_max + gamma / (2 * sqrt_beta)
+
+    f_min = np.exp(-u_min * (gamma + beta_value * u_min))
+    f_max = np.exp(-u_max * (gamma + beta_value * u_max))
+
+    erfcx = scipy.special.erfcx
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        # erf(s_max) - erf(s_min), scaled by exp(gamma ** 2 / (4 * beta)),
+        # for a range above, below or across the maximum of the integrand
+        above = f_min * erfcx(s_min) - f_max * erfcx(s_max)
+        below = f_max * erfcx(-s_max) - f_min * erfcx(-s_min)
+        across = (
+            2 * np.exp(gamma ** 2 / (4 * beta_value))
+            - f_max * erfcx(s_max)
+            - f_min * erfcx(-s_min)
+        )
+
+    diff = np.where(s_min >= 0, above, np.where(s_max <= 0, below, across))
+    integral = np.sqrt(np.pi) / (2 * sqrt_beta) * diff
+    return amplitude * reference ** (energy_power + 1) * integral
+
+
 class SpectralModel(Model):
     """Spectral model base class."""
 
@@ -241,6 +378,45 @@ class SpectralModel(Model):
         else:
             return integrate_spectrum(f, energy_min, energy_max, **kwargs)
 
+    def integral_and_energy_flux(self, energy_min, energy_max, ndecade=100):
+        """Compute integral flux and energy flux in given energy range.
+
+        Analytical solutions are used if defined. Otherwise the model is evaluated
+        once on the grid used by `integrate_spectrum` and both integrals are computed
+        from the same values.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        ndecade : int, optional
+            Number of grid points per decade used for the numerical integration.
+
+        Returns
+        -------
+        integral, energy_flux : tuple of `~astropy.units.Quantity`
+            Integral flux and energy flux between energy_min and energy_max.
+        """
+        cls = type(self)
+        is_numerical = (
+            not hasattr(self, "evaluate_integral")
+            and not hasattr(self, "evaluate_energy_flux")
+            and cls.integral is SpectralModel.integral
+            and cls.energy_flux is SpectralModel.energy_flux
+        )
+
+        if not is_numerical:
+            return (
+                self.integral(energy_min, energy_max, ndecade=ndecade),
+                self.energy_flux(energy_min, energy_max, ndecade=ndecade),
+            )
+
+        energy = _integration_energy_grid(energy_min, energy_max, ndecade)
+        dnde = self(energy)
+        integral = trapz_loglog(dnde, energy, axis=-1).sum(axis=0)
+        energy_flux = trapz_loglog(energy * dnde, energy, axis=-1).sum(axis=0)
+        return integral, energy_flux
+
     def energy_flux_error(self, energy_min, energy_max, epsilon=1e-4, **kwargs):
         """Evaluate the error of the energy flux of a given spectrum in
             a given energy range.
@@ -282,13 +458,14 @@ class SpectralModel(Model):
         """
         energy = energy_axis.center
         energy_min, energy_max = energy_axis.edges_min, energy_axis.edges_max
+        flux, eflux = self.integral_and_energy_flux(energy_min, energy_max)
         return {
             "e_ref": energy,
             "e_min": energy_min,
             "e_max": energy_max,
             "ref_dnde": self(energy),
-            "ref_flux": self.integral(energy_min, energy_max),
-            "ref_eflux": self.energy_flux(energy_min, energy_max),
+            "ref_flux": flux,
+            "ref_eflux": eflux,
             "ref_e2dnde": self(energy) * energy ** 2,
         }
 
@@ -641,6 +818,10 @@ class PowerLawSpectralModel(SpectralModel):
     @staticmethod
     def evaluate(energy, index, amplitude, reference):
         """Evaluate the model (static function)."""
+        if _has_float_fast_path(energy, index, amplitude, reference):
+            xx = energy.to_value(reference.unit) / reference.value
+            return amplitude.value * np.power(xx, -index.to_value("")) * amplitude.unit
+
         return amplitude * np.power((energy / reference), -index)
 
     @staticmethod
@@ -705,6 +886,32 @@ class PowerLawSpectralModel(SpectralModel):
 
         return energy_flux
 
+    def _propagate_error(self, epsilon, fct, **kwargs):
+        """Evaluate error for a given function with uncertainty propagation.
+
+        If only the amplitude has an error, the flux, integral flux and energy
+        flux are linear in the amplitude and the relative error is computed in
+        closed form. Otherwise the numerical gradient of the base class is used.
+        """
+        variance = np.diag(self.covariance)
+        amplitude = self.amplitude
+
+        for par, var in zip(self.parameters, variance):
+            if par.name != "amplitude" and not par.frozen and var != 0:
+                return super()._propagate_error(epsilon=epsilon, fct=fct, **kwargs)
+
+        if amplitude.frozen:
+            rel_err = 0
+        elif amplitude.value != 0:
+            idx = self.parameters.index("amplitude")
+            rel_err = np.sqrt(variance[idx]) / np.abs(amplitude.value)
+        else:
+            return super()._propagate_error(epsilon=epsilon, fct=fct, **kwargs)
+
+        f_0 = fct(**kwargs)
+        f_err = np.abs(np.atleast_1d(f_0.value)) * rel_err
+        return u.Quantity([f_0.value, f_err], unit=f_0.unit)
+
     def inverse(self, value, *args):
         """Return energy for a given function value of the spectral model.
 
@@ -1102,6 +1309,14 @@ class ExpCutoffPowerLawSpectralModel(SpectralModel):
     @staticmethod
     def evaluate(energy, index, amplitude, reference, lambda_, alpha):
         """Evaluate the model (static function)."""
+        if _has_float_fast_path(energy, index, amplitude, reference, lambda_, alpha):
+            e = energy.to_value(reference.unit)
+            pwl = amplitude.value * np.power(e / reference.value, -index.to_value(""))
+            cutoff = np.exp(
+                -np.power(e * lambda_.to_value(1 / reference.unit), alpha.to_value(""))
+            )
+            return pwl * cutoff * amplitude.unit
+
         pwl = amplitude * (energy / reference) ** (-index)
         cutoff = np.exp(-np.power(energy * lambda_, alpha))
 
@@ -1194,6 +1409,44 @@ class ExpCutoffPowerLaw3FGLSpectralModel(SpectralModel):
         cutoff = np.exp((reference - energy) / ecut)
         return pwl * cutoff
 
+    @staticmethod
+    def evaluate_integral(energy_min, energy_max, index, amplitude, reference, ecut):
+        """Integrate model numerically (static function).
+
+        See `integrate_spectrum_gauss_legendre` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+
+        def f(energy):
+            return ExpCutoffPowerLaw3FGLSpectralModel.evaluate(
+                energy, index, amplitude, reference, ecut
+            )
+
+        return integrate_spectrum_gauss_legendre(f, energy_min, energy_max)
+
+    @staticmethod
+    def evaluate_energy_flux(energy_min, energy_max, index, amplitude, reference, ecut):
+        """Compute energy flux in given energy range numerically (static function).
+
+        See `integrate_spectrum_gauss_legendre` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+
+        def f(energy):
+            return energy * ExpCutoffPowerLaw3FGLSpectralModel.evaluate(
+                energy, index, amplitude, reference, ecut
+            )
+
+        return integrate_spectrum_gauss_legendre(f, energy_min, energy_max)
+
 
 class SuperExpCutoffPowerLaw3FGLSpectralModel(SpectralModel):
     r"""Spectral super exponential cutoff power-law model used for 3FGL.
@@ -1310,10 +1563,58 @@ class LogParabolaSpectralModel(SpectralModel):
     @staticmethod
     def evaluate(energy, amplitude, reference, alpha, beta):
         """Evaluate the model (static function)."""
+        if _has_float_fast_path(energy, amplitude, reference, alpha, beta):
+            xx = energy.to_value(reference.unit) / reference.value
+            exponent = -alpha.to_value("") - beta.to_value("") * np.log(xx)
+            return amplitude.value * np.power(xx, exponent) * amplitude.unit
+
         xx = energy / reference
         exponent = -alpha - beta * np.log(xx)
         return amplitude * np.power(xx, exponent)
 
+    @staticmethod
+    def evaluate_integral(energy_min, energy_max, amplitude, reference, alpha, beta):
+        """Integrate log parabola analytically (static function).
+
+        See `integrate_log_parabola` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+        return integrate_log_parabola(
+            energy_min,
+            energy_max,
+            amplitude,
+            reference,
+            alpha,
+            beta,
+            evaluate=LogParabolaSpectralModel.evaluate,
+        )
+
+    @staticmethod
+    def evaluate_energy_flux(energy_min, energy_max, amplitude, reference, alpha, beta):
+        """Compute energy flux in given energy range analytically (static function).
+
+        See `integrate_log_parabola` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+        return integrate_log_parabola(
+            energy_min,
+            energy_max,
+            amplitude,
+            reference,
+            alpha,
+            beta,
+            evaluate=LogParabolaSpectralModel.evaluate,
+            energy_power=1,
+        )
+
     @property
     def e_peak(self):
         r"""Spectral energy distribution peak energy (`~astropy.units.Quantity`).
@@ -1366,6 +1667,49 @@ class LogParabolaNormSpectralModel(SpectralModel):
         exponent = -alpha - beta * np.log(xx)
         return norm * np.power(xx, exponent)
 
+    @staticmethod
+    def evaluate_integral(energy_min, energy_max, norm, reference, alpha, beta):
+        """Integrate log parabola analytically (static function).
+
+        See `integrate_log_parabola` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+        return integrate_log_parabola(
+            energy_min,
+            energy_max,
+            norm,
+            reference,
+            alpha,
+            beta,
+            evaluate=LogParabolaNormSpectralModel.evaluate,
+        )
+
+    @staticmethod
+    def evaluate_energy_flux(energy_min, energy_max, norm, reference, alpha, beta):
+        """Compute energy flux in given energy range analytically (static function).
+
+        See `integrate_log_parabola` for details.
+
+        Parameters
+        ----------
+        energy_min, energy_max : `~astropy.units.Quantity`
+            Lower and upper bound of integration range.
+        """
+        return integrate_log_parabola(
+            energy_min,
+            energy_max,
+            norm,
+            reference,
+            alpha,
+            beta,
+            evaluate=LogParabolaNormSpectralModel.evaluate,
+            energy_power=1,
+        )
+
 
 class TemplateSpectralModel(SpectralModel):
     """A model generated from a table of energy and value arrays.
@@ -1901,7 +2245,7 @@ class GaussianSpectralModel(SpectralModel):
             * (scipy.special.erf(u_max) - scipy.special.erf(u_min))
         )
 
-    def energy_flux(self, energy_min, energy_max):
+    def energy_flux(self, energy_min, energy_max, **kwargs):
         r"""Compute energy flux in given energy range analytically.
 
         .. math::
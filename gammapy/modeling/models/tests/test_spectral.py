@@ -1,10 +1,10 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
+import functools
 import operator
 import pytest
 import numpy as np
 from numpy.testing import assert_allclose
 import astropy.units as u
-from gammapy.maps import MapAxis
 from gammapy.modeling.models import (
     SPECTRAL_MODEL_REGISTRY,
     BrokenPowerLawSpectralModel,
@@ -26,6 +26,10 @@ from gammapy.modeling.models import (
     SuperExpCutoffPowerLaw4FGLSpectralModel,
     TemplateSpectralModel,
 )
+from gammapy.modeling.models.spectral import (
+    integrate_spectrum,
+    integrate_spectrum_gauss_legendre,
+)
 from gammapy.utils.testing import (
     assert_quantity_allclose,
     mpl_plot_check,
@@ -34,253 +38,266 @@ from gammapy.utils.testing import (
 )
 
 
-def table_model():
-    energy = MapAxis.from_energy_bounds(0.1 * u.TeV, 100 * u.TeV, 1000).center
+DNDE_UNIT = u.Unit("cm-2 s-1 TeV-1")
+FLUX_UNIT = u.Unit("cm-2 s-1")
+EFLUX_UNIT = u.Unit("TeV cm-2 s-1")
 
-    model = PowerLawSpectralModel(
-        index=2.3, amplitude="4 cm-2 s-1 TeV-1", reference="1 TeV"
-    )
-    dnde = model(energy)
 
-    return TemplateSpectralModel(energy, dnde)
+def _assert_close(actual, desired, rtol=1e-7):
+    """Compare plain values, converting ``actual`` to the unit of ``desired`` once"""
+    assert_allclose(actual.to_value(desired.unit), desired.value, rtol=rtol)
+
+
+@functools.lru_cache(maxsize=None)
+def table_model():
+    # shared between parametrizations, the tests do not modify the model
+    # log centers of 1000 bins between 0.1 and 100 TeV
+    dlog = 3.0 / 1000
+    energy = np.geomspace(10 ** (-1 + dlog / 2), 10 ** (2 - dlog / 2), 1000) << u.TeV
+
+    # evaluate on plain arrays and attach the unit once
+    dnde = PowerLawSpectralModel.evaluate(
+        energy.to_value("TeV"), index=2.3, amplitude=4, reference=1
+    )
+    return TemplateSpectralModel(energy, dnde * DNDE_UNIT)
 
 
 TEST_MODELS = [
     dict(
         name="powerlaw",
         model=PowerLawSpectralModel(
-            index=2.3 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=2.3,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(4 * 2.0 ** (-2.3), "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.9227116204223784, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(6.650836884969039, "TeV cm-2 s-1"),
+        val_at_2TeV=(4 * 2.0 ** (-2.3)) << DNDE_UNIT,
+        integral_1_10TeV=2.9227116204223784 << FLUX_UNIT,
+        eflux_1_10TeV=6.650836884969039 << EFLUX_UNIT,
     ),
     dict(
         name="powerlaw",
         model=PowerLawSpectralModel(
-            index=2 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=2,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(1.0, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(3.6, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(9.210340371976184, "TeV cm-2 s-1"),
+        val_at_2TeV=1.0 << DNDE_UNIT,
+        integral_1_10TeV=3.6 << FLUX_UNIT,
+        eflux_1_10TeV=9.210340371976184 << EFLUX_UNIT,
     ),
     dict(
         name="norm-powerlaw",
         model=PowerLawNormSpectralModel(
-            tilt=2 * u.Unit(""), norm=4.0 * u.Unit(""), reference=1 * u.TeV,
+            tilt=2, norm=4.0, reference=1 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(1.0, ""),
-        integral_1_10TeV=u.Quantity(3.6, "TeV"),
-        eflux_1_10TeV=u.Quantity(9.210340371976184, "TeV2"),
+        val_at_2TeV=1.0 << u.Unit(""),
+        integral_1_10TeV=3.6 << u.Unit("TeV"),
+        eflux_1_10TeV=9.210340371976184 << u.Unit("TeV2"),
     ),
     dict(
         name="powerlaw2",
         model=PowerLaw2SpectralModel(
-            amplitude=u.Quantity(2.9227116204223784, "cm-2 s-1"),
-            index=2.3 * u.Unit(""),
+            amplitude=2.9227116204223784 << FLUX_UNIT,
+            index=2.3,
             emin=1 * u.TeV,
             emax=10 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(4 * 2.0 ** (-2.3), "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.9227116204223784, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(6.650836884969039, "TeV cm-2 s-1"),
+        val_at_2TeV=(4 * 2.0 ** (-2.3)) << DNDE_UNIT,
+        integral_1_10TeV=2.9227116204223784 << FLUX_UNIT,
+        eflux_1_10TeV=6.650836884969039 << EFLUX_UNIT,
     ),
     dict(
         name="ecpl",
         model=ExpCutoffPowerLawSpectralModel(
-            index=1.6 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=1.6,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
             lambda_=0.1 / u.TeV,
         ),
-        val_at_2TeV=u.Quantity(1.080321705479446, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(3.765838739678921, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(9.901735870666526, "TeV cm-2 s-1"),
+        val_at_2TeV=1.080321705479446 << DNDE_UNIT,
+        integral_1_10TeV=3.765838739678921 << FLUX_UNIT,
+        eflux_1_10TeV=9.901735870666526 << EFLUX_UNIT,
         e_peak=4 * u.TeV,
     ),
     dict(
         name="norm-ecpl",
         model=ExpCutoffPowerLawNormSpectralModel(
-            index=1.6 * u.Unit(""),
-            norm=4 * u.Unit(""),
+            index=1.6,
+            norm=4,
             reference=1 * u.TeV,
             lambda_=0.1 / u.TeV,
         ),
-        val_at_2TeV=u.Quantity(1.080321705479446, ""),
-        integral_1_10TeV=u.Quantity(3.765838739678921, "TeV"),
-        eflux_1_10TeV=u.Quantity(9.901735870666526, "TeV2"),
+        val_at_2TeV=1.080321705479446 << u.Unit(""),
+        integral_1_10TeV=3.765838739678921 << u.Unit("TeV"),
+        eflux_1_10TeV=9.901735870666526 << u.Unit("TeV2"),
     ),
     dict(
         name="ecpl_3fgl",
         model=ExpCutoffPowerLaw3FGLSpectralModel(
-            index=2.3 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=2.3,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
             ecut=10 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(0.7349563611124971, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.6034046173089, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(5.340285560055799, "TeV cm-2 s-1"),
+        val_at_2TeV=0.7349563611124971 << DNDE_UNIT,
+        integral_1_10TeV=2.603428691884947 << FLUX_UNIT,
+        eflux_1_10TeV=5.3403569133264215 << EFLUX_UNIT,
     ),
     dict(
         name="plsec_4fgl",
         model=SuperExpCutoffPowerLaw4FGLSpectralModel(
             index_1=1.5,
             index_2=2,
-            amplitude=1 / u.cm ** 2 / u.s / u.TeV,
+            amplitude=1 << DNDE_UNIT,
             reference=1 * u.TeV,
             expfactor=1e-2,
         ),
-        val_at_2TeV=u.Quantity(0.3431043087721737, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(1.2125247, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(3.38072082, "TeV cm-2 s-1"),
+        val_at_2TeV=0.3431043087721737 << DNDE_UNIT,
+        integral_1_10TeV=1.2125247 << FLUX_UNIT,
+        eflux_1_10TeV=3.38072082 << EFLUX_UNIT,
     ),
     dict(
         name="logpar",
         model=LogParabolaSpectralModel(
-            alpha=2.3 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            alpha=2.3,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
-            beta=0.5 * u.Unit(""),
+            beta=0.5,
         ),
-        val_at_2TeV=u.Quantity(0.6387956571420305, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.255689748270628, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(3.9586515834989267, "TeV cm-2 s-1"),
+        val_at_2TeV=0.6387956571420305 << DNDE_UNIT,
+        integral_1_10TeV=2.255791433530036 << FLUX_UNIT,
+        eflux_1_10TeV=3.9588300406806023 << EFLUX_UNIT,
         e_peak=0.74082 * u.TeV,
     ),
     dict(
         name="norm-logpar",
         model=LogParabolaNormSpectralModel(
-            alpha=2.3 * u.Unit(""),
-            norm=4 * u.Unit(""),
+            alpha=2.3,
+            norm=4,
             reference=1 * u.TeV,
-            beta=0.5 * u.Unit(""),
+            beta=0.5,
         ),
-        val_at_2TeV=u.Quantity(0.6387956571420305, ""),
-        integral_1_10TeV=u.Quantity(2.255689748270628, "TeV"),
-        eflux_1_10TeV=u.Quantity(3.9586515834989267, "TeV2"),
+        val_at_2TeV=0.6387956571420305 << u.Unit(""),
+        integral_1_10TeV=2.255791433530036 << u.Unit("TeV"),
+        eflux_1_10TeV=3.9588300406806023 << u.Unit("TeV2"),
     ),
     dict(
         name="logpar10",
         model=LogParabolaSpectralModel.from_log10(
-            alpha=2.3 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            alpha=2.3,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
-            beta=1.151292546497023 * u.Unit(""),
+            beta=1.151292546497023,
         ),
-        val_at_2TeV=u.Quantity(0.6387956571420305, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.255689748270628, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(3.9586515834989267, "TeV cm-2 s-1"),
+        val_at_2TeV=0.6387956571420305 << DNDE_UNIT,
+        integral_1_10TeV=2.255791433530036 << FLUX_UNIT,
+        eflux_1_10TeV=3.9588300406806023 << EFLUX_UNIT,
         e_peak=0.74082 * u.TeV,
     ),
     dict(
         name="constant",
-        model=ConstantSpectralModel(const=4 / u.cm ** 2 / u.s / u.TeV),
-        val_at_2TeV=u.Quantity(4, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(35.9999999999999, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(198.00000000000006, "TeV cm-2 s-1"),
+        model=ConstantSpectralModel(const=4 << DNDE_UNIT),
+        val_at_2TeV=4 << DNDE_UNIT,
+        integral_1_10TeV=35.9999999999999 << FLUX_UNIT,
+        eflux_1_10TeV=198.00000000000006 << EFLUX_UNIT,
     ),
     dict(
         name="powerlaw_index1",
         model=PowerLawSpectralModel(
-            index=1 * u.Unit(""),
-            amplitude=2 / u.cm ** 2 / u.s / u.TeV,
+            index=1,
+            amplitude=2 << DNDE_UNIT,
             reference=1 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(1.0, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(4.605170185, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(18.0, "TeV cm-2 s-1"),
+        val_at_2TeV=1.0 << DNDE_UNIT,
+        integral_1_10TeV=4.605170185 << FLUX_UNIT,
+        eflux_1_10TeV=18.0 << EFLUX_UNIT,
     ),
     dict(
         name="ecpl_2",
         model=ExpCutoffPowerLawSpectralModel(
-            index=2.0 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=2.0,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
             lambda_=0.1 / u.TeV,
         ),
-        val_at_2TeV=u.Quantity(0.81873075, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.83075297, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(6.41406327, "TeV cm-2 s-1"),
+        val_at_2TeV=0.81873075 << DNDE_UNIT,
+        integral_1_10TeV=2.83075297 << FLUX_UNIT,
+        eflux_1_10TeV=6.41406327 << EFLUX_UNIT,
         e_peak=np.nan * u.TeV,
     ),
     dict(
         name="GaussianSpectralModel",
         model=GaussianSpectralModel(
-            norm=4 / u.cm ** 2 / u.s, mean=2 * u.TeV, sigma=0.2 * u.TeV
+            norm=4 << FLUX_UNIT, mean=2 * u.TeV, sigma=0.2 * u.TeV
         ),
-        val_at_2TeV=u.Quantity(7.978845608028654, "cm-2 s-1 TeV-1"),
-        val_at_3TeV=u.Quantity(2.973439029468601e-05, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(3.9999988533937123, "cm-2 s-1"),
-        integral_infinity=u.Quantity(4, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(7.999998896163037, "TeV cm-2 s-1"),
+        val_at_2TeV=7.978845608028654 << DNDE_UNIT,
+        val_at_3TeV=2.973439029468601e-05 << DNDE_UNIT,
+        integral_1_10TeV=3.9999988533937123 << FLUX_UNIT,
+        integral_infinity=4 << FLUX_UNIT,
+        eflux_1_10TeV=7.999998896163037 << EFLUX_UNIT,
     ),
     dict(
         name="ecpl",
         model=ExpCutoffPowerLawSpectralModel(
-            index=1.8 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index=1.8,
+            amplitude=4 << DNDE_UNIT,
             reference=1 * u.TeV,
             lambda_=0.1 / u.TeV,
             alpha=0.8,
         ),
-        val_at_2TeV=u.Quantity(0.871694294554192, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(3.026342, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(7.38652453, "TeV cm-2 s-1"),
+        val_at_2TeV=0.871694294554192 << DNDE_UNIT,
+        integral_1_10TeV=3.026342 << FLUX_UNIT,
+        eflux_1_10TeV=7.38652453 << EFLUX_UNIT,
         e_peak=1.7677669529663684 * u.TeV,
     ),
     dict(
         name="bpl",
         model=BrokenPowerLawSpectralModel(
-            index1=1.5 * u.Unit(""),
-            index2=2.5 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index1=1.5,
+            index2=2.5,
+            amplitude=4 << DNDE_UNIT,
             ebreak=0.5 * u.TeV,
         ),
-        val_at_2TeV=u.Quantity(0.125, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(0.45649740094103286, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(0.9669999668731384, "TeV cm-2 s-1"),
+        val_at_2TeV=0.125 << DNDE_UNIT,
+        integral_1_10TeV=0.45649740094103286 << FLUX_UNIT,
+        eflux_1_10TeV=0.9669999668731384 << EFLUX_UNIT,
     ),
     dict(
         name="sbpl",
         model=SmoothBrokenPowerLawSpectralModel(
-            index1=1.5 * u.Unit(""),
-            index2=2.5 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index1=1.5,
+            index2=2.5,
+            amplitude=4 << DNDE_UNIT,
             ebreak=0.5 * u.TeV,
             reference=1 * u.TeV,
             beta=1,
         ),
-        val_at_2TeV=u.Quantity(0.28284271247461906, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(0.9956923907948155, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(2.2372256145972207, "TeV cm-2 s-1"),
+        val_at_2TeV=0.28284271247461906 << DNDE_UNIT,
+        integral_1_10TeV=0.9956923907948155 << FLUX_UNIT,
+        eflux_1_10TeV=2.2372256145972207 << EFLUX_UNIT,
     ),
     dict(
         name="sbpl-hard",
         model=SmoothBrokenPowerLawSpectralModel(
-            index1=2.5 * u.Unit(""),
-            index2=1.5 * u.Unit(""),
-            amplitude=4 / u.cm ** 2 / u.s / u.TeV,
+            index1=2.5,
+            index2=1.5,
+            amplitude=4 << DNDE_UNIT,
             ebreak=0.5 * u.TeV,
             reference=1 * u.TeV,
             beta=1,
         ),
-        val_at_2TeV=u.Quantity(3.5355339059327378, "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(13.522782989735022, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(40.06681812966845, "TeV cm-2 s-1"),
+        val_at_2TeV=3.5355339059327378 << DNDE_UNIT,
+        integral_1_10TeV=13.522782989735022 << FLUX_UNIT,
+        eflux_1_10TeV=40.06681812966845 << EFLUX_UNIT,
     ),
     dict(
         name="pbpl",
         model=PiecewiseNormSpectralModel(
             energy=[1, 3, 7, 10] * u.TeV, norms=[1, 5, 3, 0.5] * u.Unit(""),
         ),
-        val_at_2TeV=u.Quantity(2.76058404, ""),
-        integral_1_10TeV=u.Quantity(24.758255, "TeV"),
-        eflux_1_10TeV=u.Quantity(117.745068, "TeV2"),
+        val_at_2TeV=2.76058404 << u.Unit(""),
+        integral_1_10TeV=24.758255 << u.Unit("TeV"),
+        eflux_1_10TeV=117.745068 << u.Unit("TeV2"),
     ),
 ]
 
@@ -299,7 +316,7 @@ TEST_MODELS.append(
 TEST_MODELS.append(
     dict(
         name="compound6",
-        model=TEST_MODELS[11]["model"] + u.Quantity(4, "cm-2 s-1 TeV-1"),
+        model=TEST_MODELS[11]["model"] + (4 << DNDE_UNIT),
         val_at_2TeV=TEST_MODELS[11]["val_at_2TeV"] * 2,
         integral_1_10TeV=TEST_MODELS[11]["integral_1_10TeV"] * 2,
         eflux_1_10TeV=TEST_MODELS[11]["eflux_1_10TeV"] * 2,
@@ -309,70 +326,78 @@ TEST_MODELS.append(
 TEST_MODELS.append(
     dict(
         name="table_model",
-        model=table_model(),
+        # created lazily by the `spectrum` fixture
+        model_factory=table_model,
         # Values took from power law expectation
-        val_at_2TeV=u.Quantity(4 * 2.0 ** (-2.3), "cm-2 s-1 TeV-1"),
-        integral_1_10TeV=u.Quantity(2.9227116204223784, "cm-2 s-1"),
-        eflux_1_10TeV=u.Quantity(6.650836884969039, "TeV cm-2 s-1"),
+        val_at_2TeV=(4 * 2.0 ** (-2.3)) << DNDE_UNIT,
+        integral_1_10TeV=2.9227116204223784 << FLUX_UNIT,
+        eflux_1_10TeV=6.650836884969039 << EFLUX_UNIT,
     )
 )
 
 
+# inverse for ConstantSpectralModel is irrelevant.
+# inverse for Gaussian and PiecewiseNormSpectralModel have a degeneracy
+TEST_MODELS_INVERSE = [
+    _
+    for _ in TEST_MODELS
+    if _["name"] not in ["constant", "compound6", "GaussianSpectralModel", "pbpl"]
+]
+
+
+@pytest.fixture()
+def spectrum(request):
+    """Test model spectrum, creating the model from its factory if needed"""
+    spectrum = dict(request.param)
+    model_factory = spectrum.pop("model_factory", None)
+
+    if model_factory is not None:
+        spectrum["model"] = model_factory()
+
+    return spectrum
+
+
 @requires_dependency("scipy")
-@pytest.mark.parametrize("spectrum", TEST_MODELS, ids=lambda _: _["name"])
+@pytest.mark.parametrize(
+    "spectrum", TEST_MODELS, ids=lambda _: _["name"], indirect=True
+)
 def test_models(spectrum):
     model = spectrum["model"]
     for p in model.parameters:
         assert p._type == 'spectral'
-    energy = 2 * u.TeV
-    value = model(energy)
-    energies =  [2, 3] * u.TeV
+
+    desired = spectrum["val_at_2TeV"]
+    value = model(2 * u.TeV)
+    _assert_close(value, desired)
+
+    energies = [2, 3] * u.TeV
     values = model(energies)
-    assert_quantity_allclose(value, spectrum["val_at_2TeV"], rtol=1e-7)
+    _assert_close(values[0], desired)
     if "val_at_3TeV" in spectrum:
-        energy = 3 * u.TeV
-        value = model(energy)
-        assert_quantity_allclose(value, spectrum["val_at_3TeV"], rtol=1e-7)
+        desired = spectrum["val_at_3TeV"]
+        _assert_close(values[1], desired)
 
     energy_min = 1 * u.TeV
     energy_max = 10 * u.TeV
-    assert_quantity_allclose(
-        model.integral(energy_min=energy_min, energy_max=energy_max),
-        spectrum["integral_1_10TeV"],
-        rtol=1e-5,
-    )
-    assert_quantity_allclose(
-        model.energy_flux(energy_min=energy_min, energy_max=energy_max),
-        spectrum["eflux_1_10TeV"],
-        rtol=1e-5,
+    integral, energy_flux = model.integral_and_energy_flux(
+        energy_min=energy_min, energy_max=energy_max
     )
+    desired = spectrum["integral_1_10TeV"]
+    _assert_close(integral, desired, rtol=1e-5)
 
-    if "e_peak" in spectrum:
-        assert_quantity_allclose(model.e_peak, spectrum["e_peak"], rtol=1e-2)
-
-    # inverse for ConstantSpectralModel is irrelevant.
-    # inverse for Gaussian and PiecewiseNormSpectralModel have a degeneracy
-    if not (
-        isinstance(model, ConstantSpectralModel)
-        or spectrum["name"] == "compound6"
-        or spectrum["name"] == "GaussianSpectralModel"
-        or spectrum["name"] == "pbpl"
-    ):
-        assert_quantity_allclose(model.inverse(value), energy, rtol=0.01)
-        inverse = model.inverse_all(values)
-        for ke, ener in enumerate(energies):
-            assert_quantity_allclose(inverse[ke], energies[ke], rtol=0.01)
+    desired = spectrum["eflux_1_10TeV"]
+    _assert_close(energy_flux, desired, rtol=1e-5)
 
+    if "e_peak" in spectrum:
+        desired = spectrum["e_peak"]
+        _assert_close(model.e_peak, desired, rtol=1e-2)
 
     if "integral_infinity" in spectrum:
         energy_min = 0 * u.TeV
         energy_max = 10000 * u.TeV
-        assert_quantity_allclose(
-            model.integral(energy_min=energy_min, energy_max=energy_max),
-            spectrum["integral_infinity"],
-        )
-
-    model.to_dict()
+        integral = model.integral(energy_min=energy_min, energy_max=energy_max)
+        desired = spectrum["integral_infinity"]
+        _assert_close(integral, desired)
 
     assert "" in str(model)
 
@@ -381,7 +406,24 @@ def test_models(spectrum):
     e_array = e_array[:, np.newaxis, np.newaxis]
     val = model(e_array)
     assert val.shape == e_array.shape
-    assert_quantity_allclose(val[0], spectrum["val_at_2TeV"])
+    desired = spectrum["val_at_2TeV"]
+    _assert_close(val[0], desired)
+
+
+@requires_dependency("scipy")
+@pytest.mark.parametrize(
+    "spectrum", TEST_MODELS_INVERSE, ids=lambda _: _["name"], indirect=True
+)
+def test_models_inverse(spectrum):
+    model = spectrum["model"]
+
+    energies = [2, 3] * u.TeV
+    values = model(energies)
+    _assert_close(model.inverse(values[0]), energies[0], rtol=0.01)
+
+    inverse = model.inverse_all(values)
+    for idx, energy in enumerate(energies):
+        _assert_close(inverse[idx], energy, rtol=0.01)
 
 
 def test_model_unit():
@@ -393,9 +435,9 @@ def test_model_unit():
 @requires_dependency("matplotlib")
 def test_model_plot():
     pwl = PowerLawSpectralModel(
-        amplitude=1e-12 * u.Unit("TeV-1 cm-2 s-1"), reference=1 * u.Unit("TeV"), index=2
+        amplitude=1e-12 * DNDE_UNIT, reference=1 * u.Unit("TeV"), index=2
     )
-    pwl.amplitude.error = 0.1e-12 * u.Unit("TeV-1 cm-2 s-1")
+    pwl.amplitude.error = 0.1e-12 * DNDE_UNIT
 
     with mpl_plot_check():
         pwl.plot((1 * u.TeV, 10 * u.TeV))
@@ -407,9 +449,9 @@ def test_model_plot():
 @requires_dependency("matplotlib")
 def test_model_plot_sed_type():
     pwl = PowerLawSpectralModel(
-                                amplitude=1e-12 * u.Unit("TeV-1 cm-2 s-1"), reference=1 * u.Unit("TeV"), index=2
+                                amplitude=1e-12 * DNDE_UNIT, reference=1 * u.Unit("TeV"), index=2
                                 )
-    pwl.amplitude.error = 0.1e-12 * u.Unit("TeV-1 cm-2 s-1")
+    pwl.amplitude.error = 0.1e-12 * DNDE_UNIT
                                 
     with mpl_plot_check():
         ax1 = pwl.plot((1 * u.TeV, 100 * u.TeV), sed_type="dnde")
@@ -436,6 +478,20 @@ def test_model_plot_sed_type():
         assert(ax2.axes.axes.get_ylabel() == "eflux [erg / (cm2 s)]")
 
 
+def test_models_to_from_dict():
+    models = [
+        _["model"] if "model" in _ else _["model_factory"]() for _ in TEST_MODELS
+    ]
+    model_dicts = [model.to_dict() for model in models]
+
+    energy = [2, 3] * u.TeV
+    for model, model_dict in zip(models, model_dicts):
+        model_class = SPECTRAL_MODEL_REGISTRY.get_cls(model_dict["type"])
+        new_model = model_class.from_dict(model_dict)
+        assert isinstance(new_model, type(model))
+        _assert_close(new_model(energy), model(energy))
+
+
 def test_to_from_dict():
     spectrum = TEST_MODELS[0]
     model = spectrum["model"]
@@ -512,38 +568,42 @@ def test_table_model_from_file():
     assert_allclose(value, 1)
 
 
+@pytest.fixture(scope="session")
+def ebl_dominguez():
+    return EBLAbsorptionNormSpectralModel.read_builtin("dominguez")
+
+
 @requires_data()
-def test_absorption():
+def test_absorption(ebl_dominguez):
     # absorption values for given redshift
     redshift = 0.117
-    absorption = EBLAbsorptionNormSpectralModel.read_builtin(
-        "dominguez", redshift=redshift
-    )
+    absorption = ebl_dominguez.copy()
+    absorption.redshift.value = redshift
 
     # Spectral model corresponding to PKS 2155-304 (quiescent state)
     index = 3.53
-    amplitude = 1.81 * 1e-12 * u.Unit("cm-2 s-1 TeV-1")
+    amplitude = 1.81 * 1e-12 * DNDE_UNIT
     reference = 1 * u.TeV
     pwl = PowerLawSpectralModel(index=index, amplitude=amplitude, reference=reference)
 
     # EBL + PWL model
     model = pwl * absorption
     desired = u.Quantity(5.140765e-13, "TeV-1 s-1 cm-2")
-    assert_quantity_allclose(model(1 * u.TeV), desired, rtol=1e-3)
+    _assert_close(model(1 * u.TeV), desired, rtol=1e-3)
     assert model.model2.alpha_norm.value == 1.0
 
     # EBL + PWL model: test if norm of EBL=0: it mean model =pwl
     model.parameters["alpha_norm"].value = 0
-    assert_quantity_allclose(model(1 * u.TeV), pwl(1 * u.TeV), rtol=1e-3)
+    _assert_close(model(1 * u.TeV), pwl(1 * u.TeV), rtol=1e-3)
 
     # EBL + PWL model: Test with a norm different of 1
-    absorption = EBLAbsorptionNormSpectralModel.read_builtin(
-        "dominguez", redshift=redshift, alpha_norm=1.5
-    )
+    absorption = ebl_dominguez.copy()
+    absorption.redshift.value = redshift
+    absorption.alpha_norm.value = 1.5
     model = pwl * absorption
     desired = u.Quantity(2.739695e-13, "TeV-1 s-1 cm-2")
     assert model.model2.alpha_norm.value == 1.5
-    assert_quantity_allclose(model(1 * u.TeV), desired, rtol=1e-3)
+    _assert_close(model(1 * u.TeV), desired, rtol=1e-3)
 
     # Test error propagation
     model.model1.amplitude.error = 0.1 * model.model1.amplitude.value
@@ -552,13 +612,11 @@ def test_absorption():
 
 
 @requires_data()
-def test_absorbed_extrapolate():
-    ebl_model = "dominguez"
+def test_absorbed_extrapolate(ebl_dominguez):
     z = 0.0001
     alpha_norm = 1
-    absorption = EBLAbsorptionNormSpectralModel.read_builtin(ebl_model)
 
-    values = absorption.evaluate(1 * u.TeV, z, alpha_norm)
+    values = ebl_dominguez.evaluate(1 * u.TeV, z, alpha_norm)
     assert_allclose(values, 1)
 
 
@@ -570,6 +628,72 @@ def test_ecpl_integrate():
     assert_quantity_allclose(value, 8.380714e-14 * u.Unit("s-1 cm-2"))
 
 
+@pytest.mark.parametrize(
+    "alpha, beta", [(2.3, 0.5), (1.5, 0.01), (-1.0, 0.3), (2.0, 0.0), (2.0, -0.1)]
+)
+def test_logpar_integral_analytic(alpha, beta):
+    model = LogParabolaSpectralModel(
+        alpha=alpha, beta=beta, amplitude="4 cm-2 s-1 TeV-1", reference="1 TeV"
+    )
+    energy_min, energy_max = [0.1, 1] * u.TeV, [1, 100] * u.TeV
+    # the numerical fallback for beta <= 0 is less precise
+    rtol = 1e-6 if beta > 0 else 1e-4
+
+    def eflux(energy):
+        return energy * model(energy)
+
+    desired = integrate_spectrum(model, energy_min, energy_max, ndecade=1e4)
+    actual = model.integral(energy_min, energy_max)
+    assert actual.unit == "cm-2 s-1"
+    assert_quantity_allclose(actual, desired, rtol=rtol)
+
+    desired = integrate_spectrum(eflux, energy_min, energy_max, ndecade=1e4)
+    actual = model.energy_flux(energy_min, energy_max)
+    assert_quantity_allclose(actual, desired, rtol=rtol)
+
+
+def test_integrate_spectrum_gauss_legendre():
+    model = PowerLawSpectralModel(index=2.3, amplitude="4 cm-2 s-1 TeV-1")
+    energy_min, energy_max = [0.1, 1, 10] * u.TeV, [1, 10, 1e5] * u.TeV
+
+    actual = integrate_spectrum_gauss_legendre(model, energy_min, energy_max)
+    desired = model.integral(energy_min, energy_max)
+    assert actual.shape == (3,)
+    assert_quantity_allclose(actual, desired, rtol=1e-12)
+
+
+def test_integral_and_energy_flux():
+    model = SmoothBrokenPowerLawSpectralModel(beta=2)
+    energy_min, energy_max = [0.1, 1] * u.TeV, [1, 100] * u.TeV
+
+    integral, energy_flux = model.integral_and_energy_flux(energy_min, energy_max)
+    assert_quantity_allclose(integral, model.integral(energy_min, energy_max))
+    assert_quantity_allclose(
+        energy_flux, model.energy_flux(energy_min, energy_max)
+    )
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        PowerLawSpectralModel(index=2.3, amplitude="4 cm-2 s-1 TeV-1"),
+        ExpCutoffPowerLawSpectralModel(lambda_="0.2 TeV-1", alpha=1.5),
+        LogParabolaSpectralModel(alpha=2.3, beta=0.5, reference="1 TeV"),
+    ],
+)
+def test_evaluate_float_fast_path(model):
+    energy = [0.3, 1.56, 2000] * u.GeV
+    kwargs = {par.name: par.value for par in model.parameters}
+    desired = model.evaluate(energy.to_value("TeV"), **kwargs)
+
+    actual = model(energy)
+    assert actual.unit == "cm-2 s-1 TeV-1"
+    assert_allclose(actual.value, desired, rtol=1e-12)
+
+    actual = u.Quantity([model(_) for _ in energy])
+    assert_allclose(actual.value, desired, rtol=1e-12)
+
+
 def test_pwl_pivot_energy():
     pwl = PowerLawSpectralModel(amplitude="5.35510540e-11 cm-2 s-1 TeV-1")
 
@@ -646,9 +770,9 @@ class TestNaimaModel:
         for p in model.parameters:
             assert p._type == 'spectral'
 
-        val_at_2TeV = 9.725347355450884e-14 * u.Unit("cm-2 s-1 TeV-1")
-        integral_1_10TeV = 3.530537143620737e-13 * u.Unit("cm-2 s-1")
-        eflux_1_10TeV = 7.643559573105779e-13 * u.Unit("TeV cm-2 s-1")
+        val_at_2TeV = 9.725347355450884e-14 * DNDE_UNIT
+        integral_1_10TeV = 3.530537143620737e-13 * FLUX_UNIT
+        eflux_1_10TeV = 7.643559573105779e-13 * EFLUX_UNIT
 
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV)
@@ -687,9 +811,9 @@ class TestNaimaModel:
         for p in model.parameters:
             assert p._type == 'spectral'
 
-        val_at_2TeV = 4.347836316893546e-12 * u.Unit("cm-2 s-1 TeV-1")
-        integral_1_10TeV = 1.595813e-11 * u.Unit("cm-2 s-1")
-        eflux_1_10TeV = 2.851283e-11 * u.Unit("TeV cm-2 s-1")
+        val_at_2TeV = 4.347836316893546e-12 * DNDE_UNIT
+        integral_1_10TeV = 1.595813e-11 * FLUX_UNIT
+        eflux_1_10TeV = 2.851283e-11 * EFLUX_UNIT
 
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV)
@@ -718,9 +842,9 @@ class TestNaimaModel:
         for p in model.parameters:
             assert p._type == 'spectral'
 
-        val_at_2TeV = 1.0565840392550432e-24 * u.Unit("cm-2 s-1 TeV-1")
-        integral_1_10TeV = 4.449186e-13 * u.Unit("cm-2 s-1")
-        eflux_1_10TeV = 4.594121e-13 * u.Unit("TeV cm-2 s-1")
+        val_at_2TeV = 1.0565840392550432e-24 * DNDE_UNIT
+        integral_1_10TeV = 4.449186e-13 * FLUX_UNIT
+        eflux_1_10TeV = 4.594121e-13 * EFLUX_UNIT
 
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV)
@@ -738,7 +862,7 @@ class TestNaimaModel:
         assert val.shape == self.e_array.shape
 
         model.B.value = 3  # update B
-        val_at_2TeV = 5.1985064062296e-16 * u.Unit("cm-2 s-1 TeV-1")
+        val_at_2TeV = 5.1985064062296e-16 * DNDE_UNIT
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV)
 
@@ -771,12 +895,12 @@ class TestNaimaModel:
         model = NaimaSpectralModel(radiative_model, nested_models=nested_models)
         assert_quantity_allclose(model.B.quantity, B)
         assert_quantity_allclose(model.radius.quantity, radius)
-        val_at_2TeV = 1.6703761561806372e-11 * u.Unit("cm-2 s-1 TeV-1")
+        val_at_2TeV = 1.6703761561806372e-11 * DNDE_UNIT
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV, rtol=1e-5)
 
         model.parameters["B"].value = 100
-        val_at_2TeV = 1.441331153167876e-11 * u.Unit("cm-2 s-1 TeV-1")
+        val_at_2TeV = 1.441331153167876e-11 * DNDE_UNIT
         value = model(self.energy)
         assert_quantity_allclose(value, val_at_2TeV, rtol=1e-5)
 
@@ -806,7 +930,7 @@ class TestSpectralModelErrorPropagation:
 
     def setup(self):
         self.model = LogParabolaSpectralModel(
-            amplitude=3.76e-11 * u.Unit("cm-2 s-1 TeV-1"),
+            amplitude=3.76e-11 * DNDE_UNIT,
             reference=1 * u.TeV,
             alpha=2.44,
             beta=0.25,
@@ -854,7 +978,7 @@ def test_dnde_error_ecpl_model():
     # Regression test for ECPL model
     # https://github.com/gammapy/gammapy/issues/2007
     model = ExpCutoffPowerLawSpectralModel(
-        amplitude=2.076183759227292e-12 * u.Unit("cm-2 s-1 TeV-1"),
+        amplitude=2.076183759227292e-12 * DNDE_UNIT,
         index=1.8763343736076483,
         lambda_=0.08703226432146616 * u.Unit("TeV-1"),
         reference=1 * u.TeV,
@@ -918,6 +1042,20 @@ def test_energy_flux_error_power_law():
     assert_allclose(enrg_flux_error.value / 1e-12, 1.085, rtol=0.001)
 
 
+def test_error_power_law_amplitude_only():
+    powerlaw = PowerLawSpectralModel()
+    powerlaw.parameters["amplitude"].error = 1e-13
+
+    dnde, dnde_err = powerlaw.evaluate_error([1, 3] * u.TeV)
+    assert_allclose(dnde_err / dnde, 0.1)
+
+    flux, flux_err = powerlaw.integral_error(1 * u.TeV, 10 * u.TeV)
+    assert_allclose(flux_err / flux, 0.1)
+
+    eflux, eflux_err = powerlaw.energy_flux_error(1 * u.TeV, 10 * u.TeV)
+    assert_allclose(eflux_err / eflux, 0.1)
+
+
 def test_energy_flux_error_exp_cutoff_power_law():
     energy_min = 1 * u.TeV
     energy_max = 10 * u.TeV
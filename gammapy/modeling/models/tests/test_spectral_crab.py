@@ -32,7 +32,7 @@ CRAB_SPECTRA = [
     {
         "name": "magic_lp",
         "dnde": u.Quantity(5.5451060834144166e-12, "cm-2 s-1 TeV-1"),
-        "flux": u.Quantity(2.028222279117e-11, "cm-2 s-1"),
+        "flux": u.Quantity(2.0282410845756e-11, "cm-2 s-1"),
         "index": 2.614495440236207,
     },
     {
@@ -27,9 +27,10 @@ except ImportError:
 
 SHOW_PROGRESS_BAR = False
 
-def progress_bar(iterable, desc=None):
-    # Necessary because iterable may be a zip
-    iterable_to_list = list(iterable)
-    total = len(iterable_to_list)
+def progress_bar(iterable, desc=None, total=None):
+    if total is None:
+        # Necessary because iterable may be a zip
+        iterable = list(iterable)
+        total = len(iterable)
 
-    return tqdm(iterable_to_list, total=total, mininterval=0, disable=not SHOW_PROGRESS_BAR, desc=desc)
\ No newline at end of file
+    return tqdm(iterable, total=total, mininterval=0, disable=not SHOW_PROGRESS_BAR, desc=desc)
\ No newline at end of file